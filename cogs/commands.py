@@ -1,3 +1,4 @@
+import datetime
 from typing import Literal, Optional
 
 from discord.ext import commands
@@ -5,8 +6,14 @@ from discord import app_commands
 import discord
 
 import db
-from utils import actions
+from utils import actions, guilds, transcript
 from utils.config import Config
+from utils.pagination import (
+    NAME_SIZE_LIMIT,
+    VALUE_SIZE_LIMIT,
+    PaginationView,
+    paginated_embed_menus,
+)
 
 import logging
 
@@ -14,6 +21,16 @@ logger = logging.getLogger(__name__)
 
 modmail_config = Config()
 
+SEARCH_RESULT_LIMIT = 100
+
+
+def _date_timestamp(date: str, days: int = 0) -> int:
+    """Returns the timestamp of midnight (UTC) at the start of a YYYY-MM-DD date, offset by a number of days."""
+    day = datetime.date.fromisoformat(date) + datetime.timedelta(days=days)
+    return int(
+        datetime.datetime.combine(day, datetime.time(), datetime.timezone.utc).timestamp()
+    )
+
 
 class Commands(commands.Cog):
     """Cog to contain command action methods."""
@@ -83,6 +100,22 @@ class Commands(commands.Cog):
         )
         return
 
+    @commands.command(name="vacuum")
+    @commands.has_permissions(manage_guild=True)
+    @commands.guild_only()
+    async def vacuum(self, ctx: commands.Context):
+        """
+        Rebuilds the database, enabling incremental freeing of disk space. Only
+        needs to be run once, on databases created before ticket archival.
+        Tickets cannot be handled while it runs.
+
+        Args:
+            ctx (commands.Context): The command context.
+        """
+        await ctx.send("Vacuuming the database, this may take a while...")
+        await db.vacuum()
+        await ctx.send("Database vacuumed.")
+
     @app_commands.command(name="open")
     @commands.guild_only()
     async def open_ticket(
@@ -174,6 +207,85 @@ class Commands(commands.Cog):
 
         await actions.message_untimeout(interaction, member)
 
+    @app_commands.command(name="search")
+    @commands.guild_only()
+    async def search_tickets(self, interaction: discord.Interaction, query: str):
+        """Searches responses in tickets that are not archived for every word of the query."""
+
+        results = await db.search_ticket_responses(query, SEARCH_RESULT_LIMIT)
+
+        if not results:
+            await interaction.response.send_message(
+                f"No responses were found matching `{query}`.", ephemeral=True
+            )
+            return
+
+        names = []
+        values = []
+        for result in results:
+            author = f"<@{result.user}> as server" if result.as_server else f"<@{result.user}>"
+            names.append(f"Ticket {result.ticket_id}, <t:{result.timestamp}:R>"[:NAME_SIZE_LIMIT])
+            values.append(f"{author}: {result.snippet}"[:VALUE_SIZE_LIMIT])
+
+        embed_dict = {
+            "title": f"Search results for {query}"[:256],
+            "description": f"Showing the {len(results)} most recent matching responses.",
+        }
+        embeds = paginated_embed_menus(names, values, embed_dict=embed_dict, lazy=True)
+
+        await interaction.response.send_message(
+            embed=embeds[0], view=PaginationView(embeds), ephemeral=True
+        )
+
+    @app_commands.command(name="transcript")
+    @commands.guild_only()
+    async def export_transcript(
+        self,
+        interaction: discord.Interaction,
+        ticket_id: Optional[int] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        file_format: transcript.TranscriptFormat = "txt",
+    ):
+        """Exports a ticket, or every ticket between two dates (YYYY-MM-DD, inclusive), to a file."""
+
+        if ticket_id is None and start is None:
+            await interaction.response.send_message(
+                "Please specify a ticket ID or a start date.", ephemeral=True
+            )
+            return
+
+        try:
+            start_timestamp = _date_timestamp(start) if start else None
+            end_timestamp = _date_timestamp(end, days=1) if end else None
+        except ValueError:
+            await interaction.response.send_message(
+                "Dates must be given as YYYY-MM-DD.", ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(thinking=True)
+
+        if ticket_id is not None:
+            title = f"Ticket {ticket_id}"
+        else:
+            title = f"Tickets from {start} to {end or 'now'}"
+        responses = db.stream_ticket_responses(ticket_id, start_timestamp, end_timestamp)
+        file, count = await transcript.write_transcript(responses, file_format, title)
+
+        with file:
+            if count == 0:
+                await interaction.followup.send("No responses were found to export.")
+                return
+
+            filename = f"{title.lower().replace(' ', '-')}.{file_format}"
+            try:
+                await interaction.followup.send(
+                    f"Exported {count} responses.", file=discord.File(file, filename)
+                )
+            except discord.errors.HTTPException as e:
+                await interaction.followup.send(f"Could not upload the transcript: {e.text}")
+
     async def cog_command_error(
         self, ctx: commands.Context, error: commands.CommandError
     ):
@@ -206,14 +318,5 @@ async def setup(bot: commands.Bot):
     Args:
         bot (commands.Bot): The bot.
     """
-    try:
-        modmail_channel = await bot.fetch_channel(modmail_config.channel)
-    except Exception as e:
-        raise ValueError(
-            "The channel specified in config was not found. Please check your config."
-        ) from e
-
-    if not isinstance(modmail_channel, discord.TextChannel):
-        raise TypeError("The channel specified in config was not a text channel.")
-
+    modmail_channel = await guilds.get_modmail_channel(bot)
     await bot.add_cog(Commands(bot, modmail_channel))
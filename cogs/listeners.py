@@ -1,18 +1,29 @@
 import datetime
+import functools
 import logging
+import time
 from typing import Optional
 
 import discord
 from discord.ext import commands
 
 import db
-from utils import ticket_embed, uformatter
+from utils import actions, guilds, members, ticket_embed, uformatter
 from utils.config import Config
+from utils.debounce import Debouncer
+from utils.dispatch import KeyedDispatcher
+from utils.messages import ticket_messages
+from utils import ratelimit
+from utils.ratelimit import Priority
+from utils.replies import reply_router
 
 logger = logging.getLogger(__name__)
 
 modmail_config = Config()
 
+# Number of tracked repost times before stale entries are pruned
+REPOSTED_AT_LIMIT = 1024
+
 
 class Listeners(commands.Cog):
     """Cog to contain all main listener methods."""
@@ -34,6 +45,41 @@ class Listeners(commands.Cog):
         self.bot = bot
         self.modmail_channel = modmail_channel
         self.allowed_guild = allowed_guild
+        self.resolver = actions.GuildMemberResolver(
+            bot, modmail_channel.guild, allowed_guild
+        )
+        self.reposted_at: dict[int, float] = {}
+        self.dispatcher = KeyedDispatcher(
+            modmail_config.max_concurrent_dms, max_pending=modmail_config.max_pending_dms
+        )
+        self.debouncer: Optional[Debouncer] = None
+
+        if modmail_config.update_debounce_ms > 0:
+            self.debouncer = Debouncer(
+                modmail_config.update_debounce_ms / 1000,
+                modmail_config.update_max_delay_ms / 1000,
+            )
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        members.member_cache.invalidate(member.guild.id, member.id)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, _: discord.Member, after: discord.Member):
+        members.member_cache.invalidate(after.guild.id, after.id)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        members.member_cache.invalidate(payload.guild_id, payload.user.id)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        ticket_messages.discard(payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        for message_id in payload.message_ids:
+            ticket_messages.discard(message_id)
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -42,39 +88,50 @@ class Listeners(commands.Cog):
         Args:
             message (discord.Message): The current message.
         """
+        # Server messages may be staff replies to tickets
+        if message.guild is not None:
+            reply_router.dispatch(message)
+            return
+
         # Accepts messages from DMs only and ignore bots
-        if message.guild is None and not message.author.bot:
-            # Scenario 1: Main Guild
-            try:
-                if self.modmail_channel.guild.get_member(
-                    message.author.id
-                ) or await self.modmail_channel.guild.fetch_member(message.author.id):
-                    await self.handle_dm(message, self.modmail_channel.guild)
-                    return
-            except discord.errors.NotFound:
-                pass
+        if not message.author.bot:
+            # DMs from one user are processed in order, one at a time
+            if not await self.dispatcher.submit(
+                message.author.id, functools.partial(self.process_dm, message)
+            ):
+                logger.warning(f"Dropped DM from {message.author.id}, too many DMs pending.")
+                try:
+                    await ratelimit.send(
+                        message.author,
+                        Priority.HIGH,
+                        content="Your message could not be delivered as we are receiving too many messages. Please send it again in a few minutes.",
+                    )
+                except discord.errors.Forbidden:
+                    pass
+
+    async def process_dm(self, message: discord.Message):
+        """Checks which guild the DM author is in before handling the DM.
 
-            # Scenario 2: Allowed Guild
-            try:
-                if self.allowed_guild and (
-                    self.allowed_guild.get_member(message.author.id)
-                    or await self.allowed_guild.fetch_member(message.author.id)
-                ):
-                    await self.handle_dm(message, self.allowed_guild)
-                    return
-            except discord.errors.NotFound:
-                pass
+        Args:
+            message (discord.Message): The current message.
+        """
+        # Scenario 1 and 2: Main Guild or Allowed Guild, looked up concurrently
+        member, source_guild = await self.resolver.resolve(message.author.id)
 
-            # Scenario 3: Neither Guild
-            try:
-                join_message = "Unable to send message. Please ensure you are in the IB Discord Server (https://discord.com/invite/ibo)."
+        if member and source_guild:
+            await self.handle_dm(message, source_guild)
+            return
 
-                if modmail_config.allowed_guild:
-                    join_message += f"\n\nIf you are submitting a ban appeal, please join the IB Discord Ban Appeals server ({modmail_config.allowed_guild.invite})."
+        # Scenario 3: Neither Guild
+        try:
+            join_message = "Unable to send message. Please ensure you are in the IB Discord Server (https://discord.com/invite/ibo)."
 
-                await message.author.send(join_message)
-            except discord.errors.Forbidden:
-                pass
+            if modmail_config.allowed_guild:
+                join_message += f"\n\nIf you are submitting a ban appeal, please join the IB Discord Ban Appeals server ({modmail_config.allowed_guild.invite})."
+
+            await ratelimit.send(message.author, Priority.HIGH, content=join_message)
+        except discord.errors.Forbidden:
+            pass
 
     async def handle_dm(self, message: discord.Message, source_guild: discord.Guild):
         """Handle DM messages.
@@ -85,13 +142,14 @@ class Listeners(commands.Cog):
         """
 
         user = message.author
-        guild = self.bot.get_guild(self.modmail_channel.guild.id)
 
         timeout = await db.get_timeout(user.id)
         current_time = int(datetime.datetime.now().timestamp())
 
         if timeout and current_time < timeout.timestamp:
-            await user.send(embed=ticket_embed.user_timeout(timeout.timestamp))
+            await ratelimit.send(
+                user, Priority.HIGH, embed=ticket_embed.user_timeout(timeout.timestamp)
+            )
             return
 
         response = uformatter.format_message(message)
@@ -101,46 +159,130 @@ class Listeners(commands.Cog):
 
         # ! Fix for longer messages
         if len(response) > 1000:
-            await message.channel.send(
-                "Your message is too long. Please shorten your message or send in multiple parts."
+            await ratelimit.send(
+                user,
+                Priority.HIGH,
+                content="Your message is too long. Please shorten your message or send in multiple parts.",
             )
             return
 
-        ticket = await db.get_ticket_by_user(user.id)
+        # Looking up (or opening) the ticket and adding the response happen in one transaction
+        async with db.transaction():
+            ticket = await db.get_ticket_by_user(user.id)
 
-        if not ticket:
-            ticket_id = await db.open_ticket(user.id)
-            ticket = await db.get_ticket(ticket_id)
-            logger.info(f"Opened new ticket for: {user.id}")
+            if not ticket:
+                ticket_id = await db.open_ticket(user.id)
+                ticket = await db.get_ticket(ticket_id)
+                logger.info(f"Opened new ticket for: {user.id}")
 
-        try:
-            if ticket and ticket.message_id is not None:
-                old_ticket_message = await self.modmail_channel.fetch_message(
-                    ticket.message_id
-                )
-                await old_ticket_message.delete()
-        except discord.errors.NotFound:
-            await message.channel.send(
-                "You are being rate limited. Please wait a few seconds before trying again."
+            # `ticket` truthiness has been checked prior to the following lines
+            if not db.write_behind_enabled():
+                await db.add_ticket_response(ticket.ticket_id, user.id, response, False)
+
+        if db.write_behind_enabled():
+            # Queued responses are committed together with those of other DMs
+            written = await db.defer(
+                db.add_ticket_response, ticket.ticket_id, user.id, response, False
             )
-            return
+            try:
+                await written
+            except Exception:
+                # Not reacting tells the user their message did not reach staff
+                logger.exception(f"Failed to add response to ticket {ticket.ticket_id}.")
+                return
+
+        if self.debouncer:
+            # Bursts of DMs are collapsed into a single ticket message update
+            self.debouncer.schedule(
+                ticket.ticket_id,
+                functools.partial(self.refresh_ticket_message, ticket.ticket_id, source_guild),
+            )
+            await db.flush()
+        else:
+            await self.refresh_ticket_message(ticket.ticket_id, source_guild)
 
-        # `ticket` truthiness has been checked prior to the following lines
-        await db.add_ticket_response(ticket.ticket_id, user.id, response, False)
+        # The reaction is only cosmetic, so it is dropped under load
+        ratelimit.react(message, "📨")
+
+    async def refresh_ticket_message(self, ticket_id: int, source_guild: discord.Guild):
+        """Renders the ticket and updates its message in the modmail channel.
+
+        Args:
+            ticket_id (int): The ticket ID.
+            source_guild (discord.Guild): The guild where the ticket user is from.
+        """
+        # Queued writes (responses and the last repost's message ID) are read back below
+        await db.flush()
 
+        # Re-read the ticket, as it may have been reposted or closed in the meantime
+        ticket = await db.get_ticket(ticket_id)
+
+        if not ticket or not ticket.open:
+            return
+
+        guild = self.bot.get_guild(self.modmail_channel.guild.id)
         embeds = await ticket_embed.channel_embed(guild, source_guild, ticket)
 
         message_embed, buttons_view = await ticket_embed.MessageButtonsView(
             self.bot, embeds
         ).return_paginated_embed()
 
-        ticket_message = await self.modmail_channel.send(
-            embed=message_embed, view=buttons_view
-        )
-        await message.add_reaction("📨")
+        await self.post_ticket_message(ticket, message_embed, buttons_view)
+
+    async def post_ticket_message(
+        self, ticket: db.Ticket, embed: discord.Embed, view: discord.ui.View
+    ):
+        """Reposts the ticket message at the bottom of the modmail channel, or edits
+        it in place if it was already reposted within the configured repost interval.
+
+        Args:
+            ticket (db.Ticket): The ticket.
+            embed (discord.Embed): The ticket embed.
+            view (discord.ui.View): The ticket buttons view.
+        """
+        now = time.monotonic()
+        reposted_at = self.reposted_at.get(ticket.ticket_id)
+
+        if (
+            ticket.message_id is not None
+            and reposted_at is not None
+            and now - reposted_at < modmail_config.repost_interval
+        ):
+            try:
+                ticket_message = ticket_messages.get(self.modmail_channel, ticket.message_id)
+                ticket_messages.add(
+                    await ratelimit.edit(ticket_message, Priority.HIGH, embed=embed, view=view)
+                )
+                return
+            except discord.errors.NotFound:
+                # Repost if the ticket message has been deleted
+                pass
 
+        ticket_message = await ratelimit.send(
+            self.modmail_channel, Priority.HIGH, embed=embed, view=view
+        )
+        ticket_messages.add(ticket_message)
+        # Written straight away, as button clicks look the ticket up by its message
         await db.update_ticket_message(ticket.ticket_id, ticket_message.id)
 
+        if len(self.reposted_at) > REPOSTED_AT_LIMIT:
+            self.reposted_at = {
+                ticket_id: timestamp
+                for ticket_id, timestamp in self.reposted_at.items()
+                if now - timestamp < modmail_config.repost_interval
+            }
+        self.reposted_at[ticket.ticket_id] = now
+
+        if ticket.message_id is not None:
+            try:
+                await ratelimit.delete(
+                    ticket_messages.get(self.modmail_channel, ticket.message_id), Priority.HIGH
+                )
+                ticket_messages.discard(ticket.message_id)
+            except discord.errors.NotFound:
+                # Pass if original ticket message has been deleted already
+                pass
+
 
 async def setup(bot: commands.Bot):
     """Setup function for the listeners cog.
@@ -148,23 +290,12 @@ async def setup(bot: commands.Bot):
     Args:
         bot (commands.Bot): The bot.
     """
-    try:
-        modmail_channel = await bot.fetch_channel(modmail_config.channel)
-    except Exception as e:
-        raise ValueError(
-            "The channel specified in config was not found. Please check your config."
-        ) from e
+    modmail_channel = await guilds.get_modmail_channel(bot)
 
-    if not isinstance(modmail_channel, discord.TextChannel):
-        raise TypeError("The channel specified in config was not a text channel.")
-
-    allowed_guild = None
-    if modmail_config.allowed_guild:
-        try:
-            allowed_guild = await bot.fetch_guild(modmail_config.allowed_guild.guild_id)
-        except Exception as e:
-            raise ValueError(
-                "The guild specified in config was not found. Please check your config."
-            ) from e
+    allowed_guild = await guilds.get_allowed_guild(bot)
+    if modmail_config.allowed_guild and allowed_guild is None:
+        raise ValueError(
+            "The guild specified in config was not found. Please check your config."
+        )
 
     await bot.add_cog(Listeners(bot, modmail_channel, allowed_guild))
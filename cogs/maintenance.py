@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import time
+
+from discord.ext import commands, tasks
+
+import db
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+modmail_config = Config()
+
+# Tickets archived per transaction, so that other database operations can run in between
+ARCHIVE_BATCH_SIZE = 50
+# Free pages returned to the file system per run
+VACUUM_PAGES = 2000
+# Seconds after startup before the first run, so that it does not slow down startup
+START_DELAY = 600
+
+
+class Maintenance(commands.Cog):
+    """Cog to contain periodic database maintenance."""
+
+    def __init__(self, bot: commands.Bot) -> None:
+        """Constructs necessary attributes for database maintenance.
+
+        Args:
+            bot (commands.Bot): The bot object.
+        """
+
+        self.bot = bot
+        self.vacuum_hint_logged = False
+
+        if modmail_config.archive_after_days > 0:
+            self.archive_tickets.start()
+
+    async def cog_unload(self) -> None:
+        self.archive_tickets.cancel()
+
+    @tasks.loop(hours=1)
+    async def archive_tickets(self):
+        """Archives tickets closed longer ago than configured, then frees unused pages."""
+        closed_before = int(time.time()) - modmail_config.archive_after_days * 86400
+
+        # Errors are logged rather than raised, which would stop the loop
+        try:
+            archived = 0
+            while count := await db.archive_tickets(closed_before, ARCHIVE_BATCH_SIZE):
+                archived += count
+                await asyncio.sleep(0)
+
+            if archived:
+                logger.info(f"Archived {archived} tickets.")
+
+            if not await db.incremental_vacuum(VACUUM_PAGES) and not self.vacuum_hint_logged:
+                logger.info(
+                    "Archived tickets are not freeing disk space, as the database was created "
+                    "without incremental auto-vacuum. Run the vacuum command once to enable it."
+                )
+                self.vacuum_hint_logged = True
+        except Exception:
+            logger.exception("Ticket archival failed.")
+
+    @archive_tickets.before_loop
+    async def before_archive_tickets(self):
+        await self.bot.wait_until_ready()
+        await asyncio.sleep(START_DELAY)
+
+
+async def setup(bot: commands.Bot):
+    """Setup function for the maintenance cog.
+
+    Args:
+        bot (commands.Bot): The bot.
+    """
+    await bot.add_cog(Maintenance(bot))
@@ -1,26 +1,238 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from dataclasses import dataclass
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
 import functools
-from typing import Awaitable, Callable, Concatenate, Optional, ParamSpec, TypeVar
-from aiosqlite import connect, Row, Cursor
+import heapq
+from itertools import starmap
+import json
+import logging
+import queue
+import sqlite3
+import time
+import zlib
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Concatenate,
+    Iterable,
+    Optional,
+    ParamSpec,
+    TypeVar,
+)
+from aiosqlite import connect, Connection, Cursor
+
+logger = logging.getLogger(__name__)
 
 
 # For development/local testing, use "modmail.db"
 # For production and working with Docker, use "/database/modmail.db"
 PATH = "/database/modmail.db"
 
+# Applied to the shared connection when it is opened. WAL lets readers run
+# alongside the writer, and with WAL "NORMAL" sync only fsyncs on checkpoint.
+PRAGMAS = [
+    "PRAGMA auto_vacuum=INCREMENTAL;",  # Only takes effect for new databases
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA busy_timeout=5000;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-16000;",
+]
+
+# Rows fetched per round trip when streaming large reads
+STREAM_BATCH_SIZE = 500
+
 P = ParamSpec("P")
 R = TypeVar("R")
 
+_connection: Optional[Connection] = None
+_lock = asyncio.Lock()
+_transaction_cursor: ContextVar[Optional[Cursor]] = ContextVar(
+    "_transaction_cursor", default=None
+)
+
+
+class ReadPool:
+    """
+    Read-only connections served by a dedicated thread pool, for heavy reads
+    (transcripts, search) which must not queue behind the shared connection.
+    """
+
+    def __init__(self, path: str, size: int) -> None:
+        """
+        Args:
+            path (str): Path of the database file.
+            size (int): Number of reads which can run at once.
+        """
+        self.path = path
+        self.size = size
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="db-read")
+        self._idle: queue.SimpleQueue[sqlite3.Connection] = queue.SimpleQueue()
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True, check_same_thread=False
+            )
+
+    def _release(self, conn: sqlite3.Connection):
+        if self._idle.qsize() < self.size:
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+    async def _run(self, func: Callable[..., R], *args) -> R:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def fetchall(self, sql: str, parameters: Iterable[Any] = ()) -> list[tuple]:
+        """
+        Runs a query and fetches every row.
+
+        Args:
+            sql (str): The query.
+            parameters (Iterable[Any], optional): The query parameters. Defaults to ().
+
+        Returns:
+            list[tuple]: The rows.
+        """
+
+        def fetchall() -> list[tuple]:
+            conn = self._acquire()
+            try:
+                return conn.execute(sql, list(parameters)).fetchall()
+            finally:
+                self._release(conn)
+
+        return await self._run(fetchall)
+
+    async def stream(
+        self, sql: str, parameters: Iterable[Any] = (), batch_size: int = 500
+    ) -> AsyncIterator[list[tuple]]:
+        """
+        Runs a query and fetches its rows in batches, holding one connection until done.
+
+        Args:
+            sql (str): The query.
+            parameters (Iterable[Any], optional): The query parameters. Defaults to ().
+            batch_size (int, optional): Rows fetched per batch. Defaults to 500.
+
+        Yields:
+            list[tuple]: The next batch of rows.
+        """
+        conn = self._acquire()
+        cursor = None
+        try:
+            cursor = await self._run(conn.execute, sql, list(parameters))
+            while rows := await self._run(cursor.fetchmany, batch_size):
+                yield rows
+        finally:
+            if cursor is not None:
+                cursor.close()
+            self._release(conn)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+_read_pool: Optional[ReadPool] = None
+
+
+async def open_connection(read_pool_size: int = 2):
+    """
+    Opens the shared database connection used by all database operations,
+    and the read-only connection pool used for heavy reads.
+
+    Args:
+        read_pool_size (int, optional): Number of heavy reads which can run at once. Defaults to 2.
+    """
+    global _connection, _read_pool
+    if _connection is not None:
+        return
+
+    # Rows are kept as plain tuples and unpacked straight into the record types
+    conn = await connect(PATH)
+    for pragma in PRAGMAS:
+        await conn.execute(pragma)
+
+    _connection = conn
+    _read_pool = ReadPool(PATH, read_pool_size)
+
+
+def read_pool() -> ReadPool:
+    if _read_pool is None:
+        raise RuntimeError("Database connection has not been opened.")
+    return _read_pool
+
+
+async def close_connection():
+    """Closes the shared database connection and read-only connections, if open."""
+    global _connection, _read_pool
+    if _connection is None:
+        return
+
+    await stop_write_behind()
+
+    if _read_pool is not None:
+        pool, _read_pool = _read_pool, None
+        await asyncio.to_thread(pool.close)
+
+    async with _lock:
+        conn, _connection = _connection, None
+        await conn.execute("PRAGMA optimize;")
+        await conn.close()
+
 
 @asynccontextmanager
 async def db_ops():
-    conn = await connect(PATH)
-    conn.row_factory = Row
-    cursor = await conn.cursor()
-    yield cursor
-    await conn.commit()
-    await conn.close()
+    # Operations share one connection, so each one holds the lock until it
+    # has committed (or rolled back) to keep statements from interleaving.
+    async with _lock:
+        conn = _connection
+        if conn is None:
+            raise RuntimeError("Database connection has not been opened.")
+
+        cursor = await conn.cursor()
+        try:
+            yield cursor
+            await conn.commit()
+        except BaseException:
+            await conn.rollback()
+            # The rolled back statements may already have updated the caches
+            await _reload_caches(conn)
+            raise
+        finally:
+            await cursor.close()
+
+
+@asynccontextmanager
+async def transaction():
+    """
+    Runs every database operation awaited within the block on one cursor and
+    commits them together when the block exits (or rolls all of them back on error).
+
+    The write lock is taken up front, so a read-then-write sequence (e.g. checking
+    for an open ticket before opening one) cannot be interleaved with another.
+    Nested transactions join the outermost one.
+    """
+    if _transaction_cursor.get() is not None:
+        yield
+        return
+
+    async with db_ops() as cursor:
+        await cursor.execute("BEGIN IMMEDIATE")
+        token = _transaction_cursor.set(cursor)
+        try:
+            yield
+        finally:
+            _transaction_cursor.reset(token)
 
 
 def async_db_cursor(
@@ -28,13 +240,166 @@ def async_db_cursor(
 ) -> Callable[P, Awaitable[R]]:
     @functools.wraps(func)
     async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        cursor = _transaction_cursor.get()
+        if cursor is not None:
+            return await func(cursor, *args, **kwargs)
+
         async with db_ops() as cursor:
             return await func(cursor, *args, **kwargs)
 
     return wrapper
 
 
-@dataclass
+class WriteBehindQueue:
+    """Queues database writes and commits them in batches from a background task."""
+
+    def __init__(self, max_delay: float = 0.005, max_rows: int = 100) -> None:
+        """
+        Args:
+            max_delay (float, optional): Seconds to wait for more writes before committing a batch. Defaults to 0.005.
+            max_rows (int, optional): Number of queued writes that triggers an immediate commit. Defaults to 100.
+        """
+        self.max_delay = max_delay
+        self.max_rows = max_rows
+        self._pending: list[tuple[Callable[..., Awaitable[Any]], tuple, asyncio.Future]] = []
+        self._last: Optional[asyncio.Future] = None
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Commits anything still queued and stops the background task."""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def submit(self, func: Callable[..., Awaitable[R]], *args) -> asyncio.Future[R]:
+        """
+        Queues a call to a database operation.
+
+        Args:
+            func (Callable[..., Awaitable[R]]): An `async_db_cursor` decorated operation.
+
+        Returns:
+            asyncio.Future[R]: Resolves to the operation's result once its batch has committed.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((func, args, future))
+        self._last = future
+
+        self._wakeup.set()
+        if len(self._pending) >= self.max_rows:
+            self._full.set()
+
+        return future
+
+    async def flush(self):
+        """Waits until every write queued so far has been committed (or has failed)."""
+        if self._last is not None and not self._last.done():
+            await asyncio.wait([self._last])
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            if len(self._pending) < self.max_rows:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._pending[: self.max_rows]
+            self._pending = self._pending[self.max_rows :]
+            self._full.clear()
+            if not self._pending:
+                self._wakeup.clear()
+
+            await self._commit(batch)
+
+    async def _commit(self, batch):
+        try:
+            results = []
+            async with transaction():
+                for func, args, _ in batch:
+                    results.append(await func(*args))
+        except Exception:
+            logger.exception("Batched write failed, retrying writes individually.")
+            for func, args, future in batch:
+                try:
+                    future.set_result(await func(*args))
+                except Exception as e:
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+_write_behind: Optional[WriteBehindQueue] = None
+
+
+def start_write_behind(max_delay: float = 0.005, max_rows: int = 100):
+    """
+    Enables batching of writes passed to `defer`.
+
+    Args:
+        max_delay (float, optional): Seconds to wait for more writes before committing a batch. Defaults to 0.005.
+        max_rows (int, optional): Number of queued writes that triggers an immediate commit. Defaults to 100.
+    """
+    global _write_behind
+    if _write_behind is None:
+        _write_behind = WriteBehindQueue(max_delay, max_rows)
+        _write_behind.start()
+
+
+def write_behind_enabled() -> bool:
+    """
+    Returns:
+        bool: Whether writes passed to `defer` are queued.
+    """
+    return _write_behind is not None
+
+
+async def stop_write_behind():
+    """Commits any queued writes and disables batching."""
+    global _write_behind
+    if _write_behind is not None:
+        queue, _write_behind = _write_behind, None
+        await queue.stop()
+
+
+async def defer(func: Callable[..., Awaitable[R]], *args) -> asyncio.Future[R]:
+    """
+    Runs a write operation through the write-behind queue, if enabled.
+
+    Without the queue, or inside a `transaction`, the write is performed before returning.
+    Use `flush` before reading data that depends on deferred writes.
+
+    Args:
+        func (Callable[..., Awaitable[R]]): An `async_db_cursor` decorated operation.
+
+    Returns:
+        asyncio.Future[R]: Resolves to the operation's result once it has been committed.
+    """
+    if _write_behind is None or _transaction_cursor.get() is not None:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(await func(*args))
+        return future
+
+    return _write_behind.submit(func, *args)
+
+
+async def flush():
+    """Waits until every deferred write queued so far has been committed."""
+    if _write_behind is not None:
+        await _write_behind.flush()
+
+
+@dataclass(frozen=True, slots=True)
 class Ticket:
     ticket_id: int
     user: int
@@ -42,22 +407,142 @@ class Ticket:
     message_id: Optional[int]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TicketResponse:
+    response_id: int
     user: int
     response: str
     timestamp: int
     as_server: bool
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class SearchResult:
+    response_id: int
+    ticket_id: int
+    user: int
+    snippet: str
+    timestamp: int
+    as_server: bool
+
+
+@dataclass(frozen=True, slots=True)
 class Timeout:
     timeout_id: int
     timestamp: int
 
 
+class OpenTicketIndex:
+    """In-memory index of open tickets, kept in step by the ticket operations below."""
+
+    def __init__(self) -> None:
+        self.loaded = False
+        self.by_id: dict[int, Ticket] = {}
+        self.by_user: dict[int, Ticket] = {}
+        self.by_message: dict[int, Ticket] = {}
+
+    async def load(self, cursor: Cursor):
+        sql = """
+            SELECT ticket_id, user, open, message_id
+            FROM mm_tickets
+            WHERE open=1
+        """
+        await cursor.execute(sql)
+        rows = await cursor.fetchall()
+
+        self.by_id.clear()
+        self.by_user.clear()
+        self.by_message.clear()
+        for ticket in starmap(Ticket, rows):
+            self.add(ticket)
+        self.loaded = True
+
+    def add(self, ticket: Ticket):
+        self.remove(ticket.ticket_id)
+        self.by_id[ticket.ticket_id] = ticket
+        self.by_user[ticket.user] = ticket
+        if ticket.message_id is not None:
+            self.by_message[ticket.message_id] = ticket
+
+    def remove(self, ticket_id: int) -> Optional[Ticket]:
+        ticket = self.by_id.pop(ticket_id, None)
+        if ticket is not None:
+            self.by_user.pop(ticket.user, None)
+            if ticket.message_id is not None:
+                self.by_message.pop(ticket.message_id, None)
+        return ticket
+
+
+class TimeoutCache:
+    """In-memory table of active timeouts, kept in step by `set_timeout`."""
+
+    def __init__(self) -> None:
+        self.loaded = False
+        self.by_user: dict[int, Timeout] = {}
+        # Min-heap of (expiry timestamp, user); entries for replaced timeouts are
+        # skipped when they are popped
+        self._expiries: list[tuple[int, int]] = []
+
+    async def load(self, cursor: Cursor):
+        sql = """
+            SELECT user, timeout_id, timestamp
+            FROM mm_timeouts
+            WHERE timestamp > strftime('%s', 'now')
+        """
+        await cursor.execute(sql)
+        rows = await cursor.fetchall()
+
+        self.by_user.clear()
+        self._expiries.clear()
+        for user, timeout_id, timestamp in rows:
+            self.set(user, Timeout(timeout_id, timestamp))
+        self.loaded = True
+
+    def set(self, user: int, timeout: Timeout):
+        if timeout.timestamp <= int(time.time()):
+            self.by_user.pop(user, None)
+            return
+
+        self.by_user[user] = timeout
+        heapq.heappush(self._expiries, (timeout.timestamp, user))
+
+    def get(self, user: int) -> Optional[Timeout]:
+        self.evict()
+        return self.by_user.get(user)
+
+    def evict(self):
+        """Drops timeouts which have expired."""
+        now = int(time.time())
+        while self._expiries and self._expiries[0][0] <= now:
+            timestamp, user = heapq.heappop(self._expiries)
+            timeout = self.by_user.get(user)
+            if timeout is not None and timeout.timestamp == timestamp:
+                del self.by_user[user]
+
+
+_open_tickets = OpenTicketIndex()
+_timeouts = TimeoutCache()
+
+
+async def _reload_caches(conn: Connection):
+    cursor = await conn.cursor()
+    try:
+        if _open_tickets.loaded:
+            await _open_tickets.load(cursor)
+        if _timeouts.loaded:
+            await _timeouts.load(cursor)
+    except Exception:
+        logger.exception("Failed to reload database caches.")
+    finally:
+        await cursor.close()
+
+
+async def get_ticket(ticket_id: int) -> Optional[Ticket]:
+    return _open_tickets.by_id.get(ticket_id) or await _select_ticket(ticket_id)
+
+
 @async_db_cursor
-async def get_ticket(cursor: Cursor, ticket_id: int) -> Optional[Ticket]:
+async def _select_ticket(cursor: Cursor, ticket_id: int) -> Optional[Ticket]:
     sql = """
         SELECT ticket_id, user, open, message_id
         FROM mm_tickets
@@ -71,24 +556,19 @@ async def get_ticket(cursor: Cursor, ticket_id: int) -> Optional[Ticket]:
         return Ticket(*ticket)
 
 
-@async_db_cursor
-async def get_ticket_by_user(cursor: Cursor, user: int) -> Optional[Ticket]:
-    sql = """
-        SELECT ticket_id, user, open, message_id
-        FROM mm_tickets
-        WHERE user=?
-        AND open=1
-    """
-    await cursor.execute(sql, [user])
-    ticket = await cursor.fetchone()
-    if ticket is None or len(ticket) == 0:
-        return None
-    else:
-        return Ticket(*ticket)
+async def get_ticket_by_user(user: int) -> Optional[Ticket]:
+    return _open_tickets.by_user.get(user)
+
+
+async def get_ticket_by_message(message_id: int) -> Optional[Ticket]:
+    # Only messages of closed tickets need to be looked up
+    return _open_tickets.by_message.get(message_id) or await _select_ticket_by_message(
+        message_id
+    )
 
 
 @async_db_cursor
-async def get_ticket_by_message(cursor: Cursor, message_id: int) -> Optional[Ticket]:
+async def _select_ticket_by_message(cursor: Cursor, message_id: int) -> Optional[Ticket]:
     sql = """
         SELECT ticket_id, user, open, message_id
         FROM mm_tickets
@@ -109,6 +589,8 @@ async def open_ticket(cursor: Cursor, user: int) -> Optional[int]:
         VALUES (?)
     """
     await cursor.execute(sql, [user])
+    if cursor.lastrowid is not None:
+        _open_tickets.add(Ticket(cursor.lastrowid, user, 1, None))
     return cursor.lastrowid
 
 
@@ -122,6 +604,10 @@ async def update_ticket_message(
         WHERE ticket_id=?
     """
     await cursor.execute(sql, [message_id, ticket_id])
+
+    ticket = _open_tickets.by_id.get(ticket_id)
+    if ticket is not None:
+        _open_tickets.add(replace(ticket, message_id=message_id))
     return cursor.rowcount != 0
 
 
@@ -129,23 +615,99 @@ async def update_ticket_message(
 async def close_ticket(cursor: Cursor, ticket_id: int) -> bool:
     sql = """
         UPDATE mm_tickets
-        SET open=0
+        SET open=0, closed_at=strftime('%s', 'now')
         WHERE ticket_id=?
     """
     await cursor.execute(sql, [ticket_id])
+    _open_tickets.remove(ticket_id)
     return cursor.rowcount != 0
 
 
 @async_db_cursor
 async def get_ticket_responses(cursor: Cursor, ticket_id: int) -> list[TicketResponse]:
     sql = """
-        SELECT user, response, timestamp, as_server
+        SELECT response_id, user, response, timestamp, as_server
         FROM mm_ticket_responses
         WHERE ticket_id=?
+        ORDER BY response_id
     """
     await cursor.execute(sql, [ticket_id])
     rows = await cursor.fetchall()
-    return [TicketResponse(*row) for row in rows]
+
+    # Responses of archived tickets are no longer in the responses table
+    if not rows:
+        sql = """
+            SELECT responses
+            FROM mm_ticket_archives
+            WHERE ticket_id=?
+        """
+        await cursor.execute(sql, [ticket_id])
+        archive = await cursor.fetchone()
+        if archive is not None:
+            rows = json.loads(zlib.decompress(archive[0]))
+
+    return list(starmap(TicketResponse, rows))
+
+
+@async_db_cursor
+async def get_ticket_responses_after(
+    cursor: Cursor, ticket_id: int, response_id: int
+) -> list[TicketResponse]:
+    sql = """
+        SELECT response_id, user, response, timestamp, as_server
+        FROM mm_ticket_responses
+        WHERE ticket_id=?
+        AND response_id>?
+        ORDER BY response_id
+    """
+    await cursor.execute(sql, [ticket_id, response_id])
+    rows = await cursor.fetchall()
+    return list(starmap(TicketResponse, rows))
+
+
+@async_db_cursor
+async def get_last_ticket_responses(
+    cursor: Cursor, ticket_id: int, limit: int
+) -> list[TicketResponse]:
+    sql = """
+        SELECT response_id, user, response, timestamp, as_server
+        FROM mm_ticket_responses
+        WHERE ticket_id=?
+        ORDER BY response_id DESC
+        LIMIT ?
+    """
+    await cursor.execute(sql, [ticket_id, limit])
+    rows = await cursor.fetchall()
+    return list(starmap(TicketResponse, reversed(rows)))
+
+
+@async_db_cursor
+async def get_ticket_responses_before(
+    cursor: Cursor, ticket_id: int, response_id: int, limit: int
+) -> list[TicketResponse]:
+    sql = """
+        SELECT response_id, user, response, timestamp, as_server
+        FROM mm_ticket_responses
+        WHERE ticket_id=?
+        AND response_id<?
+        ORDER BY response_id DESC
+        LIMIT ?
+    """
+    await cursor.execute(sql, [ticket_id, response_id, limit])
+    rows = await cursor.fetchall()
+    return list(starmap(TicketResponse, reversed(rows)))
+
+
+@async_db_cursor
+async def count_ticket_responses(cursor: Cursor, ticket_id: int) -> int:
+    sql = """
+        SELECT COUNT(*)
+        FROM mm_ticket_responses
+        WHERE ticket_id=?
+    """
+    await cursor.execute(sql, [ticket_id])
+    (count,) = await cursor.fetchone()
+    return count
 
 
 @async_db_cursor
@@ -160,19 +722,9 @@ async def add_ticket_response(
     return cursor.lastrowid
 
 
-@async_db_cursor
-async def get_timeout(cursor: Cursor, user: int) -> Optional[Timeout]:
-    sql = """
-        SELECT timeout_id, timestamp
-        FROM mm_timeouts
-        WHERE user=?
-    """
-    await cursor.execute(sql, [user])
-    timeout = await cursor.fetchone()
-    if timeout is None or len(timeout) == 0:
-        return None
-    else:
-        return Timeout(*timeout)
+async def get_timeout(user: int) -> Optional[Timeout]:
+    # Only timeouts which have not yet expired are kept
+    return _timeouts.get(user)
 
 
 @async_db_cursor
@@ -182,11 +734,291 @@ async def set_timeout(cursor: Cursor, user: int, timestamp: int) -> Optional[int
         VALUES (?, ?)
     """
     await cursor.execute(sql, [user, timestamp])
+    _timeouts.set(user, Timeout(cursor.lastrowid, timestamp))
     return cursor.lastrowid
 
 
+def _match_terms(query: str) -> str:
+    # Quote each term so that user input is never parsed as FTS5 query syntax
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+async def search_ticket_responses(query: str, limit: int) -> list[SearchResult]:
+    """
+    Finds the most recent responses containing every term of the query. Archived
+    tickets are not searched, as archiving removes their responses from the index.
+
+    Args:
+        query (str): The search terms.
+        limit (int): Maximum number of results.
+
+    Returns:
+        list[SearchResult]: Matching responses, most recent first.
+    """
+    if not query.split():
+        return []
+
+    # The read-only connections cannot see queued writes
+    await flush()
+
+    # Ordering by rowid lets FTS5 stop after `limit` matches instead of ranking all of them
+    sql = """
+        SELECT
+            mm_ticket_responses.response_id,
+            mm_ticket_responses.ticket_id,
+            mm_ticket_responses.user,
+            snippet(mm_ticket_responses_fts, 0, '**', '**', '...', 24),
+            mm_ticket_responses.timestamp,
+            mm_ticket_responses.as_server
+        FROM mm_ticket_responses_fts
+        JOIN mm_ticket_responses
+        ON mm_ticket_responses.response_id=mm_ticket_responses_fts.rowid
+        WHERE mm_ticket_responses_fts MATCH ?
+        ORDER BY mm_ticket_responses_fts.rowid DESC
+        LIMIT ?
+    """
+    rows = await read_pool().fetchall(sql, [_match_terms(query), limit])
+    return list(starmap(SearchResult, rows))
+
+
 @async_db_cursor
-async def init(cursor: Cursor):
+async def archive_tickets(cursor: Cursor, closed_before: int, limit: int) -> int:
+    """
+    Moves the responses of closed tickets into compressed ticket archives.
+
+    Args:
+        closed_before (int): Only tickets closed before this timestamp are archived.
+        limit (int): Maximum number of tickets to archive.
+
+    Returns:
+        int: The number of tickets archived.
+    """
+    # Tickets closed before closed_at was recorded use their last response instead
+    sql = """
+        SELECT ticket_id
+        FROM mm_tickets
+        WHERE open=0
+        AND ticket_id NOT IN (SELECT ticket_id FROM mm_ticket_archives)
+        AND COALESCE(
+            closed_at,
+            (
+                SELECT MAX(timestamp)
+                FROM mm_ticket_responses
+                WHERE mm_ticket_responses.ticket_id=mm_tickets.ticket_id
+            ),
+            0
+        )<?
+        LIMIT ?
+    """
+    await cursor.execute(sql, [closed_before, limit])
+    ticket_ids = [ticket_id for (ticket_id,) in await cursor.fetchall()]
+
+    for ticket_id in ticket_ids:
+        sql = """
+            SELECT response_id, user, response, timestamp, as_server
+            FROM mm_ticket_responses
+            WHERE ticket_id=?
+            ORDER BY response_id
+        """
+        await cursor.execute(sql, [ticket_id])
+        rows = await cursor.fetchall()
+
+        sql = """
+            INSERT INTO mm_ticket_archives (ticket_id, first_timestamp, last_timestamp, responses)
+            VALUES (?, ?, ?, ?)
+        """
+        responses = zlib.compress(json.dumps(rows, separators=(",", ":")).encode())
+        first_timestamp = rows[0][3] if rows else None
+        last_timestamp = rows[-1][3] if rows else None
+        await cursor.execute(sql, [ticket_id, first_timestamp, last_timestamp, responses])
+
+        # Also removes the responses from the search index, through its trigger
+        sql = """
+            DELETE FROM mm_ticket_responses
+            WHERE ticket_id=?
+        """
+        await cursor.execute(sql, [ticket_id])
+
+    return len(ticket_ids)
+
+
+async def stream_ticket_responses(
+    ticket_id: Optional[int] = None,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+) -> AsyncIterator[tuple[int, TicketResponse]]:
+    """
+    Streams the responses of one ticket, or of every ticket between two timestamps,
+    including archived tickets. Reads run in batches on the read-only connection pool,
+    so that the shared connection is never held for the length of the export.
+
+    Args:
+        ticket_id (Optional[int], optional): The ticket to export. Defaults to None.
+        start (Optional[int], optional): Only responses at or after this timestamp. Defaults to None.
+        end (Optional[int], optional): Only responses before this timestamp. Defaults to None.
+
+    Yields:
+        tuple[int, TicketResponse]: The ticket ID and response, oldest first.
+    """
+    # The read-only connections cannot see queued writes
+    await flush()
+
+    start = start if start is not None else 0
+    end = end if end is not None else 2**62
+
+    # Filter by ticket only when given, so that the ticket index can be used
+    ticket_filter = "AND ticket_id=?" if ticket_id is not None else ""
+    ticket_params = [ticket_id] if ticket_id is not None else []
+
+    pool = read_pool()
+
+    # Archives are read in order of their first response, and overlap in time
+    sql = f"""
+        SELECT ticket_id, first_timestamp, responses
+        FROM mm_ticket_archives
+        WHERE last_timestamp>=?
+        AND first_timestamp<?
+        {ticket_filter}
+        ORDER BY first_timestamp
+    """
+    archived = _merge_archives(
+        pool, pool.stream(sql, [start, end, *ticket_params], STREAM_BATCH_SIZE), start, end
+    )
+
+    # Responses are read in primary key (and so chronological) order, which needs no sort
+    sql = f"""
+        SELECT ticket_id, response_id, user, response, timestamp, as_server
+        FROM mm_ticket_responses
+        WHERE timestamp>=?
+        AND timestamp<?
+        {ticket_filter}
+        ORDER BY response_id
+    """
+    hot = _hot_responses(pool.stream(sql, [start, end, *ticket_params], STREAM_BATCH_SIZE))
+
+    merged = _merge_streams(archived, hot)
+    try:
+        async for item in merged:
+            yield item
+    finally:
+        # Releases the read connections if the export stops early
+        await merged.aclose()
+
+
+def _load_archives(
+    archives: list[tuple[int, int, bytes]], start: int, end: int
+) -> list[tuple[int, int, list[TicketResponse]]]:
+    # Run on the read pool, so that decompressing large archives does not block the event loop
+    loaded = []
+    for ticket_id, first_timestamp, responses in archives:
+        rows = json.loads(zlib.decompress(responses))
+        loaded.append(
+            (
+                ticket_id,
+                first_timestamp,
+                [r for r in starmap(TicketResponse, rows) if start <= r.timestamp < end],
+            )
+        )
+    return loaded
+
+
+async def _merge_archives(
+    pool: ReadPool, archives: AsyncIterator[list[tuple]], start: int, end: int
+) -> AsyncIterator[tuple[int, TicketResponse]]:
+    # Archives arrive in order of their first timestamp, so buffered responses older than
+    # the next archive's first timestamp cannot be preceded by anything still to come
+    buffered: list[tuple[int, int, int, TicketResponse]] = []
+    try:
+        async for batch in archives:
+            for ticket_id, first_timestamp, responses in await pool._run(
+                _load_archives, batch, start, end
+            ):
+                while buffered and buffered[0][0] < first_timestamp:
+                    *_, buffered_ticket_id, response = heapq.heappop(buffered)
+                    yield buffered_ticket_id, response
+
+                for response in responses:
+                    heapq.heappush(
+                        buffered,
+                        (response.timestamp, response.response_id, ticket_id, response),
+                    )
+    finally:
+        await archives.aclose()
+
+    while buffered:
+        *_, buffered_ticket_id, response = heapq.heappop(buffered)
+        yield buffered_ticket_id, response
+
+
+async def _hot_responses(
+    rows: AsyncIterator[list[tuple]],
+) -> AsyncIterator[tuple[int, TicketResponse]]:
+    try:
+        async for batch in rows:
+            for row in batch:
+                yield row[0], TicketResponse(*row[1:])
+    finally:
+        await rows.aclose()
+
+
+async def _merge_streams(
+    *streams: AsyncIterator[tuple[int, TicketResponse]],
+) -> AsyncIterator[tuple[int, TicketResponse]]:
+    # Merges streams which are each ordered oldest first, keeping the next response of each
+    heads: list[tuple[int, int, int, tuple[int, TicketResponse]]] = []
+    try:
+        for index, stream in enumerate(streams):
+            item = await anext(stream, None)
+            if item is not None:
+                heads.append((item[1].timestamp, item[1].response_id, index, item))
+        heapq.heapify(heads)
+
+        while heads:
+            *_, index, item = heapq.heappop(heads)
+            yield item
+            item = await anext(streams[index], None)
+            if item is not None:
+                heapq.heappush(heads, (item[1].timestamp, item[1].response_id, index, item))
+    finally:
+        for stream in streams:
+            await stream.aclose()
+
+
+@async_db_cursor
+async def incremental_vacuum(cursor: Cursor, pages: int) -> bool:
+    """
+    Returns up to the given number of free pages to the file system.
+
+    Args:
+        pages (int): Maximum number of pages to free.
+
+    Returns:
+        bool: Whether the database uses incremental auto-vacuum. If not, nothing is freed until `vacuum` is run.
+    """
+    await cursor.execute("PRAGMA auto_vacuum;")
+    (auto_vacuum,) = await cursor.fetchone()
+
+    if auto_vacuum != 2:
+        return False
+
+    await cursor.execute(f"PRAGMA incremental_vacuum({int(pages)});")
+    await cursor.fetchall()
+    return True
+
+
+@async_db_cursor
+async def vacuum(cursor: Cursor):
+    """
+    Rebuilds the database with a full VACUUM, switching it to incremental auto-vacuum.
+    Databases created before incremental auto-vacuum need this once. Other database
+    operations wait until it has finished.
+    """
+    await cursor.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+    await cursor.execute("VACUUM;")
+
+
+async def _schema_v1(cursor: Cursor):
+    """Initial schema."""
     # Create modmail tickets table
     sql = """
     CREATE TABLE IF NOT EXISTS mm_tickets (
@@ -224,6 +1056,10 @@ async def init(cursor: Cursor):
     sql = "CREATE INDEX IF NOT EXISTS mm_ticket_responses_ticket_id ON mm_ticket_responses(ticket_id);"
     await cursor.execute(sql)
 
+    # Create modmail ticket response ticket id and response id index (for keyset pagination)
+    sql = "CREATE INDEX IF NOT EXISTS mm_ticket_responses_ticket_response ON mm_ticket_responses(ticket_id, response_id);"
+    await cursor.execute(sql)
+
     # Create modmail ticket response user index
     sql = "CREATE INDEX IF NOT EXISTS mm_ticket_responses_user ON mm_ticket_responses(user);"
     await cursor.execute(sql)
@@ -242,4 +1078,129 @@ async def init(cursor: Cursor):
     sql = "CREATE UNIQUE INDEX IF NOT EXISTS mm_timeouts_user ON mm_timeouts(user);"
     await cursor.execute(sql)
 
+
+async def _schema_v2(cursor: Cursor):
+    """Indexes tuned for the queries the bot runs."""
+    # Create partial modmail open ticket index (for loading the open ticket index)
+    sql = "CREATE INDEX IF NOT EXISTS mm_tickets_open ON mm_tickets(user) WHERE open=1;"
+    await cursor.execute(sql)
+
+    # Drop modmail ticket response ticket id index (a prefix of the ticket id and response id index)
+    sql = "DROP INDEX IF EXISTS mm_ticket_responses_ticket_id;"
+    await cursor.execute(sql)
+
+    # Gather statistics for the query planner
+    sql = "ANALYZE;"
+    await cursor.execute(sql)
+
+
+async def _schema_v3(cursor: Cursor):
+    """Ticket archives."""
+    # Add modmail ticket closed timestamp column
+    sql = "ALTER TABLE mm_tickets ADD COLUMN closed_at TIMESTAMP;"
+    await cursor.execute(sql)
+
+    # Create modmail ticket archives table
+    sql = """
+    CREATE TABLE IF NOT EXISTS mm_ticket_archives (
+        ticket_id INTEGER PRIMARY KEY,
+        first_timestamp TIMESTAMP,
+        last_timestamp TIMESTAMP,
+        responses BLOB NOT NULL,
+        FOREIGN KEY (ticket_id) REFERENCES mm_tickets (ticket_id)
+    );
+    """
+    await cursor.execute(sql)
+
+
+async def _schema_v4(cursor: Cursor):
+    """Full-text search over ticket responses."""
+    # Create modmail ticket responses full-text index
+    sql = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS mm_ticket_responses_fts USING fts5(
+        response,
+        content='mm_ticket_responses',
+        content_rowid='response_id'
+    );
+    """
+    await cursor.execute(sql)
+
+    # Keep the full-text index in sync with the responses table
+    sql = """
+    CREATE TRIGGER IF NOT EXISTS mm_ticket_responses_fts_insert
+    AFTER INSERT ON mm_ticket_responses BEGIN
+        INSERT INTO mm_ticket_responses_fts (rowid, response)
+        VALUES (new.response_id, new.response);
+    END;
+    """
+    await cursor.execute(sql)
+
+    sql = """
+    CREATE TRIGGER IF NOT EXISTS mm_ticket_responses_fts_delete
+    AFTER DELETE ON mm_ticket_responses BEGIN
+        INSERT INTO mm_ticket_responses_fts (mm_ticket_responses_fts, rowid, response)
+        VALUES ('delete', old.response_id, old.response);
+    END;
+    """
+    await cursor.execute(sql)
+
+    sql = """
+    CREATE TRIGGER IF NOT EXISTS mm_ticket_responses_fts_update
+    AFTER UPDATE OF response ON mm_ticket_responses BEGIN
+        INSERT INTO mm_ticket_responses_fts (mm_ticket_responses_fts, rowid, response)
+        VALUES ('delete', old.response_id, old.response);
+        INSERT INTO mm_ticket_responses_fts (rowid, response)
+        VALUES (new.response_id, new.response);
+    END;
+    """
+    await cursor.execute(sql)
+
+    # Index the existing responses
+    sql = "INSERT INTO mm_ticket_responses_fts (mm_ticket_responses_fts) VALUES ('rebuild');"
+    await cursor.execute(sql)
+
+
+# Each migration upgrades the schema by one version, which is tracked with
+# PRAGMA user_version. Never change a released migration, append a new one.
+MIGRATIONS: list[Callable[[Cursor], Awaitable[None]]] = [
+    _schema_v1,
+    _schema_v2,
+    _schema_v3,
+    _schema_v4,
+]
+
+
+async def migrate(cursor: Cursor) -> int:
+    """
+    Applies the migrations the database has not had yet, each in its own transaction.
+
+    Returns:
+        int: The schema version of the database.
+    """
+    await cursor.execute("PRAGMA user_version;")
+    (version,) = await cursor.fetchone()
+
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        await cursor.execute("BEGIN IMMEDIATE;")
+        try:
+            await migration(cursor)
+            await cursor.execute(f"PRAGMA user_version={number};")
+            await cursor.execute("COMMIT;")
+        except BaseException:
+            await cursor.execute("ROLLBACK;")
+            raise
+
+        logger.info(f"Migrated database schema to version {number}.")
+
+    return len(MIGRATIONS)
+
+
+@async_db_cursor
+async def init(cursor: Cursor):
+    await migrate(cursor)
+
+    # Warm the open ticket index and timeout cache
+    await _open_tickets.load(cursor)
+    await _timeouts.load(cursor)
+
     return True
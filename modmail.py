@@ -1,7 +1,11 @@
+import asyncio
+from typing import Optional
+
 import discord
 from discord.ext import commands
 
 import db
+from utils import guilds
 from utils.config import Config
 from utils.ticket_embed import MessageButtonsView
 
@@ -19,11 +23,15 @@ intents = discord.Intents.default()
 intents.members = True
 intents.message_content = True
 
-member_cache = discord.MemberCacheFlags.all()
-
 modmail_config = Config()
 
-INITIAL_COGS = ["commands", "listeners"]
+# Without a full member cache, members are looked up when needed (see utils/members.py)
+if modmail_config.member_cache == "full":
+    member_cache = discord.MemberCacheFlags.all()
+else:
+    member_cache = discord.MemberCacheFlags.none()
+
+INITIAL_COGS = ["commands", "listeners", "maintenance"]
 
 
 class Modmail(commands.Bot):
@@ -34,12 +42,23 @@ class Modmail(commands.Bot):
             description=modmail_config.status,
             application_id=modmail_config.application_id,
             member_cache_flags=member_cache,
+            # Guilds are chunked in the background so that DMs are served as soon as possible
+            chunk_guilds_at_startup=False,
         )
+        self.chunk_task: Optional[asyncio.Task] = None
 
     async def setup_hook(self):
-        await db.init()
+        await db.open_connection(modmail_config.read_pool_size)
+        # Caches are warmed while the channel and guild are resolved for the cogs
+        await asyncio.gather(
+            db.init(), guilds.get_modmail_channel(self), guilds.get_allowed_guild(self)
+        )
         logger.info("Database sucessfully initialized!")
 
+        if modmail_config.write_behind_ms > 0:
+            db.start_write_behind(modmail_config.write_behind_ms / 1000)
+            logger.info("Enabled write-behind queue.")
+
         for cog in INITIAL_COGS:
             try:
                 await bot.load_extension(f"cogs.{cog}")
@@ -57,6 +76,11 @@ class Modmail(commands.Bot):
         self.add_view(MessageButtonsView(bot, []))
         logger.info("Added all views.")
 
+    async def close(self):
+        await super().close()
+        await db.close_connection()
+        logger.info("Database connection closed.")
+
     async def on_ready(self):
         await bot.change_presence(
             activity=discord.Game(name=modmail_config.status),
@@ -65,6 +89,21 @@ class Modmail(commands.Bot):
 
         logger.info(f"Bot '{bot.user.name}' is now connected.")
 
+        if modmail_config.member_cache == "full" and (
+            self.chunk_task is None or self.chunk_task.done()
+        ):
+            self.chunk_task = asyncio.create_task(self.chunk_guilds())
+
+    async def chunk_guilds(self):
+        """Fills the member cache of each guild, one guild at a time."""
+        try:
+            for guild in self.guilds:
+                if not guild.chunked:
+                    await guild.chunk()
+            logger.info("Chunked all guilds.")
+        except Exception:
+            logger.exception("Failed to chunk guilds.")
+
     async def on_command_error(self, ctx: commands.Context, exception) -> None:
         if not isinstance(
             exception, commands.CommandNotFound
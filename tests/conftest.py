@@ -0,0 +1,13 @@
+import os
+
+# Minimal configuration, so that modules reading the config can be imported
+for key, value in {
+    "NAME": "Modmail",
+    "TOKEN": "token",
+    "APPLICATION_ID": "1",
+    "CHANNEL": "1",
+    "PREFIX": "!",
+    "STATUS": "Testing",
+    "ID_PREFIX": "mm",
+}.items():
+    os.environ.setdefault(f"MODMAIL_{key}", value)
@@ -0,0 +1,36 @@
+import asyncio
+import gc
+from unittest import mock
+
+import discord
+
+from utils import members
+from utils.actions import GuildMemberResolver
+
+
+def test_main_guild_member_is_resolved_when_allowed_lookup_fails(monkeypatch):
+    main_guild = mock.Mock(spec=discord.Guild, id=1)
+    allowed_guild = mock.Mock(spec=discord.Guild, id=2)
+    member = mock.Mock(spec=discord.Member)
+
+    async def resolve_member(guild, _):
+        if guild is allowed_guild:
+            raise discord.errors.DiscordServerError(mock.Mock(status=503), "unavailable")
+        # Let the allowed guild lookup fail before the main guild one completes
+        await asyncio.sleep(0.01)
+        return member
+
+    monkeypatch.setattr(members, "resolve_member", resolve_member)
+
+    async def test():
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda _, context: errors.append(context))
+
+        bot = mock.Mock(get_guild=mock.Mock(return_value=None))
+        resolver = GuildMemberResolver(bot, main_guild, allowed_guild)
+        assert await resolver.resolve(42) == (member, main_guild)
+
+        gc.collect()
+        assert errors == []
+
+    asyncio.run(test())
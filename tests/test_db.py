@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+import db
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "PATH", str(tmp_path / "modmail.db"))
+
+    async def run(test):
+        await db.open_connection()
+        try:
+            await db.init()
+            await test()
+        finally:
+            await db.close_connection()
+
+    return lambda test: asyncio.run(run(test))
+
+
+def test_archived_ticket_responses_are_read_from_archive(database):
+    async def test():
+        ticket_id = await db.open_ticket(1)
+        for i in range(3):
+            await db.add_ticket_response(ticket_id, 1, f"response {i}", False)
+        await db.add_ticket_response(ticket_id, 2, "staff reply", True)
+        responses = await db.get_ticket_responses(ticket_id)
+        await db.close_ticket(ticket_id)
+
+        assert await db.archive_tickets(int(time.time()) + 1, 10) == 1
+        assert await db.get_ticket_responses_after(ticket_id, 0) == []
+        assert await db.get_ticket_responses(ticket_id) == responses
+
+    database(test)
+
+
+def test_open_tickets_are_not_archived(database):
+    async def test():
+        ticket_id = await db.open_ticket(1)
+        await db.add_ticket_response(ticket_id, 1, "response", False)
+
+        assert await db.archive_tickets(int(time.time()) + 1, 10) == 0
+        assert len(await db.get_ticket_responses_after(ticket_id, 0)) == 1
+
+    database(test)
+
+
+def test_missing_ticket_has_no_responses(database):
+    async def test():
+        assert await db.get_ticket_responses(404) == []
+
+    database(test)
+
+
+def test_ticket_response_windows(database):
+    async def test():
+        ticket_id = await db.open_ticket(1)
+        for i in range(10):
+            await db.add_ticket_response(ticket_id, 1, f"response {i}", False)
+        await db.add_ticket_response(await db.open_ticket(2), 2, "other ticket", False)
+
+        last = await db.get_last_ticket_responses(ticket_id, 4)
+        assert [r.response for r in last] == [f"response {i}" for i in range(6, 10)]
+
+        before = await db.get_ticket_responses_before(ticket_id, last[0].response_id, 4)
+        assert [r.response for r in before] == [f"response {i}" for i in range(2, 6)]
+
+        after = await db.get_ticket_responses_after(ticket_id, before[-1].response_id)
+        assert after == last
+        assert await db.count_ticket_responses(ticket_id) == 10
+
+    database(test)
+
+
+@db.async_db_cursor
+async def set_response_timestamp(cursor, response_id: int, timestamp: int):
+    await cursor.execute(
+        "UPDATE mm_ticket_responses SET timestamp=? WHERE response_id=?",
+        [timestamp, response_id],
+    )
+
+
+def test_streamed_responses_are_oldest_first_across_archives(database, monkeypatch):
+    # One archive per batch, so that buffered responses are carried between batches
+    monkeypatch.setattr(db, "STREAM_BATCH_SIZE", 1)
+
+    async def test():
+        tickets = {}
+        for user, times in [(1, [100, 300]), (2, [200, 400]), (3, [250, 350])]:
+            ticket_id = await db.open_ticket(user)
+            for timestamp in times:
+                response_id = await db.add_ticket_response(ticket_id, user, str(timestamp), False)
+                await set_response_timestamp(response_id, timestamp)
+            tickets[user] = ticket_id
+
+        # Tickets 1 and 2 overlap in time once archived, while ticket 3 stays open
+        await db.close_ticket(tickets[1])
+        await db.close_ticket(tickets[2])
+        assert await db.archive_tickets(int(time.time()) + 1, 10) == 2
+
+        streamed = [
+            (ticket_id, response.response)
+            async for ticket_id, response in db.stream_ticket_responses(start=150, end=400)
+        ]
+        assert streamed == [
+            (tickets[2], "200"),
+            (tickets[3], "250"),
+            (tickets[1], "300"),
+            (tickets[3], "350"),
+        ]
+
+    database(test)
@@ -0,0 +1,53 @@
+import asyncio
+
+from utils.dispatch import KeyedDispatcher
+
+
+def test_jobs_run_in_order_per_key():
+    async def test():
+        dispatcher = KeyedDispatcher(2, max_queued=3)
+        log = []
+
+        async def job(key, i):
+            await asyncio.sleep(0.001)
+            log.append((key, i))
+
+        await asyncio.gather(
+            *(
+                dispatcher.submit(key, lambda key=key, i=i: job(key, i))
+                for i in range(10)
+                for key in range(4)
+            )
+        )
+        while dispatcher.pending:
+            await asyncio.sleep(0.001)
+
+        for key in range(4):
+            assert [i for k, i in log if k == key] == list(range(10))
+
+    asyncio.run(test())
+
+
+def test_jobs_beyond_max_pending_are_dropped():
+    async def test():
+        dispatcher = KeyedDispatcher(1, max_pending=3)
+        release = asyncio.Event()
+        ran = []
+
+        async def job(key):
+            await release.wait()
+            ran.append(key)
+
+        accepted = [
+            await dispatcher.submit(key, lambda key=key: job(key)) for key in range(5)
+        ]
+        assert accepted == [True, True, True, False, False]
+
+        release.set()
+        while dispatcher.pending:
+            await asyncio.sleep(0.001)
+
+        assert sorted(ran) == [0, 1, 2]
+        assert await dispatcher.submit(5, lambda: job(5))
+
+    asyncio.run(test())
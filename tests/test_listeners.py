@@ -0,0 +1,72 @@
+import asyncio
+import contextlib
+from unittest import mock
+
+import discord
+
+import db
+from cogs.listeners import Listeners
+from utils import ratelimit, uformatter
+from utils.dispatch import KeyedDispatcher
+
+
+def dm(author_id: int) -> mock.Mock:
+    message = mock.Mock(spec=discord.Message, guild=None)
+    message.author = mock.Mock(spec=discord.User, id=author_id, bot=False)
+    return message
+
+
+def test_dm_beyond_max_pending_asks_user_to_resend(monkeypatch):
+    monkeypatch.setattr(ratelimit, "rest_budget", ratelimit.RestBudget())
+
+    async def test():
+        channel = mock.Mock(spec=discord.TextChannel)
+        listeners = Listeners(mock.Mock(), channel)
+        listeners.dispatcher = KeyedDispatcher(1, max_pending=1)
+        release = asyncio.Event()
+        listeners.process_dm = mock.AsyncMock(side_effect=lambda _: release.wait())
+
+        accepted, dropped = dm(1), dm(2)
+        await listeners.on_message(accepted)
+        await listeners.on_message(dropped)
+        release.set()
+        while listeners.dispatcher.pending:
+            await asyncio.sleep(0.001)
+
+        listeners.process_dm.assert_awaited_once_with(accepted)
+        accepted.author.send.assert_not_called()
+        dropped.author.send.assert_awaited_once()
+        assert "send it again" in dropped.author.send.await_args.kwargs["content"]
+
+    asyncio.run(test())
+
+
+@contextlib.asynccontextmanager
+async def no_transaction():
+    yield
+
+
+def test_failed_deferred_response_is_not_acknowledged(monkeypatch):
+    async def test():
+        failed = asyncio.get_running_loop().create_future()
+        failed.set_exception(RuntimeError("database is locked"))
+
+        monkeypatch.setattr(db, "get_timeout", mock.AsyncMock(return_value=None))
+        monkeypatch.setattr(db, "transaction", no_transaction)
+        monkeypatch.setattr(
+            db, "get_ticket_by_user", mock.AsyncMock(return_value=db.Ticket(7, 1, 1, None))
+        )
+        monkeypatch.setattr(db, "write_behind_enabled", lambda: True)
+        monkeypatch.setattr(db, "defer", mock.AsyncMock(return_value=failed))
+        monkeypatch.setattr(uformatter, "format_message", lambda _: "Hello")
+        react = mock.Mock()
+        monkeypatch.setattr(ratelimit, "react", react)
+
+        listeners = Listeners(mock.Mock(), mock.Mock(spec=discord.TextChannel))
+        listeners.refresh_ticket_message = mock.AsyncMock()
+        await listeners.handle_dm(dm(1), mock.Mock(spec=discord.Guild))
+
+        listeners.refresh_ticket_message.assert_not_awaited()
+        react.assert_not_called()
+
+    asyncio.run(test())
@@ -0,0 +1,54 @@
+from unittest import mock
+
+import discord
+
+from utils.messages import TicketMessageCache
+
+
+def test_interaction_message_is_bound_to_channel():
+    cache = TicketMessageCache()
+    channel = mock.Mock(spec=discord.TextChannel)
+    partial = mock.Mock(spec=discord.PartialMessage, id=1)
+    channel.get_partial_message.return_value = partial
+    message = mock.Mock(spec=discord.InteractionMessage, id=1, channel=channel)
+
+    cache.add(message)
+
+    channel.get_partial_message.assert_called_once_with(1)
+    cached = cache.get(channel, 1)
+    assert cached is partial
+    assert not isinstance(cached, discord.InteractionMessage)
+
+
+def test_channel_message_is_cached_as_is():
+    cache = TicketMessageCache()
+    channel = mock.Mock(spec=discord.TextChannel)
+    message = mock.Mock(spec=discord.Message, id=1)
+
+    cache.add(message)
+
+    assert cache.get(channel, 1) is message
+    channel.get_partial_message.assert_not_called()
+
+
+def test_uncached_message_is_partial():
+    cache = TicketMessageCache()
+    channel = mock.Mock(spec=discord.TextChannel)
+
+    cache.add(mock.Mock(spec=discord.Message, id=1))
+    cache.discard(1)
+
+    assert cache.get(channel, 1) is channel.get_partial_message.return_value
+    channel.get_partial_message.assert_called_once_with(1)
+
+
+def test_cache_is_bounded():
+    cache = TicketMessageCache(maxsize=2)
+    channel = mock.Mock(spec=discord.TextChannel)
+    messages = [mock.Mock(spec=discord.Message, id=i) for i in range(3)]
+
+    for message in messages:
+        cache.add(message)
+
+    assert cache.get(channel, 2) is messages[2]
+    assert cache.get(channel, 0) is channel.get_partial_message.return_value
@@ -0,0 +1,73 @@
+import discord
+
+from utils.pagination import PAGE_SIZE_LIMIT, EmbedPages, paginated_embed_menus
+
+
+def field_counts(embeds) -> list[int]:
+    return [len(embed.fields) for embed in embeds]
+
+
+def test_fields_are_packed_in_order():
+    names = [f"name {i}" for i in range(25)]
+    values = [f"value {i}" for i in range(25)]
+
+    embeds = paginated_embed_menus(names, values, pagesize=10)
+
+    assert field_counts(embeds) == [10, 10, 5]
+    assert [field.name for embed in embeds for field in embed.fields] == names
+    assert [embed.footer.text for embed in embeds] == ["Page 1/3", "Page 2/3", "Page 3/3"]
+
+
+def test_first_field_overflowing_header_does_not_leave_empty_page():
+    # The header and any single field together exceed the page size limit
+    embed_dict = {"description": "d" * 4096}
+    names = [str(i) for i in range(4)]
+    values = ["v" * 1000] * 4
+
+    embeds = paginated_embed_menus(names, values, embed_dict=embed_dict)
+
+    assert field_counts(embeds) == [1, 1, 1, 1]
+
+
+def test_pages_stay_within_size_limit():
+    embed_dict = {"title": "t" * 200, "description": "d" * 1000}
+    names = [f"name {i}" for i in range(60)]
+    values = [("v" * (200 + 37 * i % 800)) for i in range(60)]
+
+    embeds = paginated_embed_menus(names, values, pagesize=25, embed_dict=embed_dict)
+
+    assert sum(field_counts(embeds)) == 60
+    for embed in embeds:
+        assert len(embed) - len(embed.footer.text) <= PAGE_SIZE_LIMIT
+        assert len(embed) <= 6000
+
+
+def test_no_entries_gives_single_page_without_footer():
+    embeds = paginated_embed_menus([], [])
+
+    assert field_counts(embeds) == [0]
+    assert embeds[0].footer.text is None
+
+
+def test_added_fields_do_not_change_earlier_snapshots():
+    pages = EmbedPages({"description": "Here is a list of entries."}, pagesize=2)
+    pages.add_field("a", "1")
+    before = pages.embeds()
+
+    pages.add_field("b", "2")
+    pages.add_field("c", "3")
+    after = pages.embeds()
+
+    assert field_counts(before) == [1]
+    assert field_counts(after) == [2, 1]
+    assert isinstance(after[-1], discord.Embed)
+
+
+def test_page_of_field():
+    pages = EmbedPages({"description": "Here is a list of entries."}, pagesize=3)
+    for i in range(7):
+        pages.add_field(str(i), "value")
+
+    assert [pages.page_of(i) for i in range(7)] == [0, 0, 0, 1, 1, 1, 2]
+    assert not pages.embeds().truncated
+    assert pages.embeds(truncated=True).truncated
@@ -0,0 +1,91 @@
+import asyncio
+from unittest import mock
+
+import discord
+
+from utils import ratelimit
+from utils.ratelimit import Priority, RestBudget, TokenBucket
+
+
+def test_waiting_calls_go_in_priority_order():
+    async def test():
+        bucket = TokenBucket(50.0, 2)
+        order = []
+
+        async def call(priority, i):
+            await bucket.acquire(priority)
+            order.append((priority, i))
+
+        tasks = [asyncio.create_task(call(Priority.HIGH, i)) for i in range(4)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(call(Priority.CRITICAL, i)) for i in range(2)]
+        await asyncio.gather(*tasks)
+
+        assert order == [
+            (Priority.HIGH, 0),
+            (Priority.HIGH, 1),
+            (Priority.CRITICAL, 0),
+            (Priority.CRITICAL, 1),
+            (Priority.HIGH, 2),
+            (Priority.HIGH, 3),
+        ]
+
+    asyncio.run(test())
+
+
+def test_channels_have_separate_budgets():
+    async def test():
+        budget = RestBudget()
+        capacity = ratelimit.ROUTE_BUDGETS["send"][1]
+
+        for _ in range(capacity):
+            await budget.acquire("send", 1, Priority.HIGH)
+
+        # Another channel, or another operation in the same channel, is not held up
+        await asyncio.wait_for(budget.acquire("send", 2, Priority.HIGH), 0.05)
+        await asyncio.wait_for(budget.acquire("delete", 1, Priority.HIGH), 0.05)
+
+        assert budget.routes[("send", 1)].tokens < 1
+
+    asyncio.run(test())
+
+
+def test_deferred_calls_are_dropped_under_load(monkeypatch):
+    monkeypatch.setattr(ratelimit, "LOW_MAX_WAIT", 0.05)
+
+    async def test():
+        budget = RestBudget()
+        job = mock.AsyncMock()
+
+        await budget.acquire("react", 1, Priority.HIGH)
+        budget.defer("react", 1, job, "📨")
+        await asyncio.sleep(0.1)
+
+        job.assert_not_called()
+
+        budget.defer("react", 2, job, "📨")
+        await asyncio.sleep(0.01)
+
+        job.assert_awaited_once_with("📨")
+
+    asyncio.run(test())
+
+
+def test_helpers_use_the_destination_channel(monkeypatch):
+    budget = RestBudget()
+    monkeypatch.setattr(ratelimit, "rest_budget", budget)
+
+    async def test():
+        channel = mock.Mock(spec=discord.TextChannel, id=10)
+        message = mock.Mock(spec=discord.PartialMessage, channel=channel)
+
+        await ratelimit.send(channel, Priority.HIGH, content="hello")
+        await ratelimit.edit(message, Priority.HIGH, content="edited")
+        await ratelimit.delete(message, Priority.HIGH)
+
+        channel.send.assert_awaited_once_with(content="hello")
+        message.edit.assert_awaited_once_with(content="edited")
+        message.delete.assert_awaited_once_with()
+        assert set(budget.routes) == {("send", 10), ("edit", 10), ("delete", 10)}
+
+    asyncio.run(test())
@@ -7,14 +7,86 @@ import discord
 from discord.ext import commands
 
 import db
-from utils import ticket_embed, uformatter
+from utils import guilds, members, ratelimit, ticket_embed, uformatter
 from utils.config import Config
+from utils.messages import ticket_messages
+from utils.ratelimit import Priority
+from utils.replies import reply_router
 
 logger = logging.getLogger(__name__)
 
 modmail_config = Config()
 
 
+class GuildMemberResolver:
+    """Resolves which of the main guild and the allowed guild a user is a member of."""
+
+    def __init__(
+        self,
+        bot: commands.Bot,
+        main_guild: discord.Guild,
+        allowed_guild: Optional[discord.Guild] = None,
+    ) -> None:
+        """
+        Args:
+            bot (commands.Bot): The bot object.
+            main_guild (discord.Guild): The main guild.
+            allowed_guild (discord.Guild, optional): The allowed guild specified in config. Defaults to None.
+        """
+        self.bot = bot
+        self.main_guild = main_guild
+        self.allowed_guild = allowed_guild
+
+    async def resolve(
+        self, user_id: int
+    ) -> tuple[discord.Member, discord.Guild] | tuple[None, None]:
+        """
+        Looks the user up in both guilds concurrently, preferring the main guild.
+
+        Args:
+            user_id (int): The user ID.
+
+        Returns:
+            tuple[discord.Member, discord.Guild] | tuple[None, None]: The member and the guild they were found in.
+        """
+        # Prefer gateway guilds, as guilds from the API have no member cache
+        main_guild = self.bot.get_guild(self.main_guild.id) or self.main_guild
+
+        allowed_lookup = None
+        if self.allowed_guild:
+            allowed_guild = self.bot.get_guild(self.allowed_guild.id) or self.allowed_guild
+            allowed_lookup = asyncio.create_task(
+                members.resolve_member(allowed_guild, user_id)
+            )
+
+        try:
+            member = await members.resolve_member(main_guild, user_id)
+        except BaseException:
+            if allowed_lookup:
+                self._discard(allowed_lookup)
+            raise
+
+        if member:
+            if allowed_lookup:
+                self._discard(allowed_lookup)
+            return member, main_guild
+
+        if allowed_lookup:
+            member = await allowed_lookup
+            if member:
+                return member, allowed_guild
+
+        return None, None
+
+    @staticmethod
+    def _discard(lookup: asyncio.Task):
+        lookup.cancel()
+        # A lookup which already failed cannot be cancelled, so its error is retrieved
+        # here rather than reported as never retrieved
+        if lookup.done() and not lookup.cancelled():
+            lookup.exception()
+
+
 async def get_guild_member(
     bot: commands.Bot, interaction: discord.Interaction, user_id: int
 ) -> tuple[discord.Member, discord.Guild] | tuple[None, None]:
@@ -25,46 +97,25 @@ async def get_guild_member(
         interaction (discord.Interaction): The interaction object.
         user_id (int): The user ID.
     """
-    try:
-        if interaction.guild:
-            member = interaction.guild.get_member(user_id) or await interaction.guild.fetch_member(user_id)
-            return member, interaction.guild
-    except discord.errors.NotFound:
-        if modmail_config.allowed_guild:
-            try:
-                allowed_guild = bot.get_guild(
-                    modmail_config.allowed_guild.guild_id
-                ) or await bot.fetch_guild(modmail_config.allowed_guild.guild_id)
-                member = allowed_guild.get_member(user_id) or await allowed_guild.fetch_member(user_id)
-                return member, allowed_guild
-            except discord.errors.NotFound:
-                pass
+    if not interaction.guild:
+        return None, None
+
+    resolver = GuildMemberResolver(bot, interaction.guild, await guilds.get_allowed_guild(bot))
+    return await resolver.resolve(user_id)
 
-    return None, None
 
-async def waiter(
-    bot: commands.Bot, interaction: discord.Interaction
-) -> Optional[discord.Message]:
+async def waiter(interaction: discord.Interaction) -> Optional[discord.Message]:
     """
     Waits for a message from the user who initiated the interaction.
 
     Args:
-        bot (commands.Bot): The bot object.
         interaction (discord.Interaction): The interaction object.
 
     Returns:
         Optional[discord.Message]: The message sent by the user.
     """
-
-    def check(message: discord.Message) -> bool:
-        return message.author == interaction.user and message.channel == interaction.channel
-
-    try:
-        message = await bot.wait_for("message", check=check)
-    except asyncio.TimeoutError:
-        return None
-
-    return message
+    # Messages are passed on by the listeners cog, see Listeners.on_message
+    return await reply_router.wait(interaction.channel_id, interaction.user.id)
 
 
 async def message_open(
@@ -83,17 +134,19 @@ async def message_open(
         source_guild (discord.Guild): The guild where the user is from.
     """
     # Check if user in main guild or allowed guild
-    ticket = await db.get_ticket_by_user(user.id)
+    async with db.transaction():
+        existing_ticket = await db.get_ticket_by_user(user.id)
 
-    if ticket:
+        if not existing_ticket:
+            ticket_id = await db.open_ticket(user.id)
+            ticket = await db.get_ticket(ticket_id)
+
+    if existing_ticket:
         await interaction.response.send_message(
             f"There is already a ticket open for {user.name}.", ephemeral=True
         )
         return
 
-    ticket_id = await db.open_ticket(user.id)
-    ticket = await db.get_ticket(ticket_id)
-
     embeds = await ticket_embed.channel_embed(interaction.guild, source_guild, ticket)
 
     message_embed, buttons_view = await ticket_embed.MessageButtonsView(
@@ -102,6 +155,7 @@ async def message_open(
     await interaction.response.send_message(embed=message_embed, view=buttons_view)
 
     ticket_message = await interaction.original_response()
+    ticket_messages.add(ticket_message)
     logger.debug(f"Ticket message: {ticket_message}")
     await db.update_ticket_message(ticket.ticket_id, ticket_message.id)
 
@@ -137,12 +191,14 @@ async def message_refresh(
     await interaction.response.send_message(embed=message_embed, view=buttons_view)
 
     message = await interaction.original_response()
+    ticket_messages.add(message)
     await db.update_ticket_message(ticket.ticket_id, message.id)
 
     if ticket.message_id is not None:
         try:
-            old_ticket_message = await interaction.channel.fetch_message(ticket.message_id)
-            await old_ticket_message.delete()
+            old_ticket_message = ticket_messages.get(interaction.channel, ticket.message_id)
+            await ratelimit.delete(old_ticket_message, Priority.HIGH)
+            ticket_messages.discard(ticket.message_id)
         except discord.errors.NotFound:
             # Pass if original ticket message has been deleted already
             pass
@@ -170,11 +226,20 @@ async def message_close(
         return
     elif confirmation_view.value:
         await db.close_ticket(ticket.ticket_id)
-        ticket_message = await interaction.channel.fetch_message(ticket.message_id)
-        await ticket_message.delete()
+        ticket_embed.discard_transcript(ticket.ticket_id)
+        if ticket.message_id is not None:
+            try:
+                ticket_message = ticket_messages.get(interaction.channel, ticket.message_id)
+                await ratelimit.delete(ticket_message, Priority.HIGH)
+                ticket_messages.discard(ticket.message_id)
+            except discord.errors.NotFound:
+                # Pass if the ticket message has been deleted already
+                pass
 
-        await interaction.channel.send(
-            embed=ticket_embed.closed_ticket(interaction.user, user)
+        await ratelimit.send(
+            interaction.channel,
+            Priority.HIGH,
+            embed=ticket_embed.closed_ticket(interaction.user, user),
         )
         logger.info(f"Ticket for user {user.id} closed by {interaction.user.id}")
 
@@ -199,7 +264,7 @@ async def message_reply(
         )
         return
 
-    task = bot.loop.create_task(waiter(bot, interaction))
+    task = bot.loop.create_task(waiter(interaction))
 
     reply_embed, cancel_view = ticket_embed.reply_cancel(ticket_user, task)
     await interaction.response.send_message(embed=reply_embed, view=cancel_view)
@@ -221,15 +286,27 @@ async def message_reply(
 
         # ! Fix for longer messages
         if len(response) > 1000:
-            await interaction.channel.send(
-                "Your message is too long. Please shorten your message or send in multiple parts."
+            await ratelimit.send(
+                interaction.channel,
+                Priority.HIGH,
+                content="Your message is too long. Please shorten your message or send in multiple parts.",
             )
             return
 
         try:
-            await ticket_user.send(embed=ticket_embed.user_embed(source_guild, response))
-            await db.add_ticket_response(ticket.ticket_id, interaction.user.id, response, True)
-            ticket_message = await interaction.channel.fetch_message(ticket.message_id)
+            # Replies to users go ahead of all other calls
+            await ratelimit.send(
+                ticket_user,
+                Priority.CRITICAL,
+                embed=ticket_embed.user_embed(source_guild, response),
+            )
+
+            # Re-read the ticket alongside the insert as it may have been reposted meanwhile
+            async with db.transaction():
+                await db.add_ticket_response(
+                    ticket.ticket_id, interaction.user.id, response, True
+                )
+                ticket = await db.get_ticket(ticket.ticket_id) or ticket
 
             embeds = await ticket_embed.channel_embed(interaction.guild, source_guild, ticket)
 
@@ -237,10 +314,17 @@ async def message_reply(
                 bot, embeds
             ).return_paginated_embed()
 
-            await ticket_message.edit(embed=channel_embed, view=buttons_view)
+            ticket_message = ticket_messages.get(interaction.channel, ticket.message_id)
+            ticket_messages.add(
+                await ratelimit.edit(
+                    ticket_message, Priority.CRITICAL, embed=channel_embed, view=buttons_view
+                )
+            )
         except discord.errors.Forbidden:
-            await interaction.channel.send(
-                f"Could not send {modmail_config.name} message to specified user due to privacy settings."
+            await ratelimit.send(
+                interaction.channel,
+                Priority.HIGH,
+                content=f"Could not send {modmail_config.name} message to specified user due to privacy settings.",
             )
 
     except Exception as e:
@@ -272,15 +356,21 @@ async def message_timeout(interaction: discord.Interaction, member: discord.Memb
         await db.set_timeout(member.id, timestamp)
         logger.info(f"User {member.id} timed out by {interaction.user.id}")
 
-        await interaction.channel.send(
-            f"{member.name} has been successfully timed out for 24 hours. They will be able to message {modmail_config.name} again after <t:{timestamp}>."
+        await ratelimit.send(
+            interaction.channel,
+            Priority.HIGH,
+            content=f"{member.name} has been successfully timed out for 24 hours. They will be able to message {modmail_config.name} again after <t:{timestamp}>.",
         )
 
         try:
-            await member.send(embed=ticket_embed.user_timeout(timestamp))
+            await ratelimit.send(
+                member, Priority.HIGH, embed=ticket_embed.user_timeout(timestamp)
+            )
         except discord.errors.Forbidden:
-            await interaction.channel.send(
-                "Could not send timeout message to specified user due to privacy settings."
+            await ratelimit.send(
+                interaction.channel,
+                Priority.HIGH,
+                content="Could not send timeout message to specified user due to privacy settings.",
             )
 
 
@@ -317,11 +407,17 @@ async def message_untimeout(interaction: discord.Interaction, member: discord.Me
         await db.set_timeout(member.id, timestamp)
         logger.info(f"Timeout removed for {member.id}.")
 
-        await interaction.channel.send(f"Timeout has been removed for {member.name}.")
+        await ratelimit.send(
+            interaction.channel,
+            Priority.HIGH,
+            content=f"Timeout has been removed for {member.name}.",
+        )
 
         try:
-            await member.send(embed=ticket_embed.user_untimeout())
+            await ratelimit.send(member, Priority.HIGH, embed=ticket_embed.user_untimeout())
         except discord.errors.Forbidden:
-            await interaction.channel.send(
-                "Could not send untimeout message to specified user due to privacy settings."
+            await ratelimit.send(
+                interaction.channel,
+                Priority.HIGH,
+                content="Could not send untimeout message to specified user due to privacy settings.",
             )
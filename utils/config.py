@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
 from confz import BaseConfig, EnvSource, FileFormat, FileSource
 from pydantic import AnyHttpUrl, SecretStr
@@ -21,6 +21,15 @@ class Config(BaseConfig):
     status: str
     id_prefix: str
     allowed_guild: Optional[AllowedGuildConfig] = None
+    write_behind_ms: int = 0
+    repost_interval: int = 0
+    update_debounce_ms: int = 0
+    update_max_delay_ms: int = 2000
+    max_concurrent_dms: int = 16
+    max_pending_dms: int = 1000
+    archive_after_days: int = 0
+    read_pool_size: int = 2
+    member_cache: Literal["full", "recent", "query"] = "full"
 
     CONFIG_SOURCES = [
         FileSource(_path, format=FileFormat.JSON, optional=True),
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingCall:
+    def __init__(self, callback: Callable[[], Awaitable[None]], deadline: float, latest: float):
+        self.callback = callback
+        self.deadline = deadline
+        self.latest = latest
+        self.task: Optional[asyncio.Task] = None
+
+
+class Debouncer:
+    """Coalesces calls scheduled under the same key into a single call."""
+
+    def __init__(self, delay: float, max_delay: float) -> None:
+        """
+        Args:
+            delay (float): Seconds without further calls before the latest callback runs.
+            max_delay (float): Maximum seconds a callback can be postponed by further calls.
+        """
+        self.delay = delay
+        self.max_delay = max_delay
+        self._pending: dict[Hashable, _PendingCall] = {}
+        self._running: dict[Hashable, asyncio.Task] = {}
+
+    def schedule(self, key: Hashable, callback: Callable[[], Awaitable[None]]):
+        """
+        Schedules a callback, replacing any callback still pending for the key.
+
+        Args:
+            key (Hashable): The key to coalesce calls by.
+            callback (Callable[[], Awaitable[None]]): The callback to run.
+        """
+        now = asyncio.get_running_loop().time()
+        pending = self._pending.get(key)
+
+        if pending is not None:
+            pending.callback = callback
+            pending.deadline = min(now + self.delay, pending.latest)
+            return
+
+        pending = _PendingCall(callback, now + self.delay, now + self.max_delay)
+        pending.task = asyncio.create_task(self._run(key, pending))
+        self._pending[key] = pending
+
+    async def _run(self, key: Hashable, pending: _PendingCall):
+        loop = asyncio.get_running_loop()
+        while (remaining := pending.deadline - loop.time()) > 0:
+            await asyncio.sleep(remaining)
+
+        del self._pending[key]
+
+        # Calls for the same key never overlap
+        previous = self._running.get(key)
+        self._running[key] = asyncio.current_task()
+        if previous is not None:
+            await asyncio.wait([previous])
+
+        try:
+            await pending.callback()
+        except Exception:
+            logger.exception(f"Debounced call for {key} failed.")
+        finally:
+            if self._running.get(key) is asyncio.current_task():
+                del self._running[key]
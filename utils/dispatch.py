@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class KeyedDispatcher:
+    """
+    Runs jobs one at a time and in order for each key, while running jobs for
+    different keys concurrently up to a global limit.
+    """
+
+    def __init__(
+        self, max_concurrency: int, max_queued: int = 50, max_pending: int = 1000
+    ) -> None:
+        """
+        Args:
+            max_concurrency (int): Maximum number of jobs running at once across all keys.
+            max_queued (int, optional): Maximum number of jobs waiting per key before submitting blocks. Defaults to 50.
+            max_pending (int, optional): Maximum number of jobs queued or running across all keys before new jobs are dropped. Defaults to 1000.
+        """
+        self.max_queued = max_queued
+        self.max_pending = max_pending
+        self.pending = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queues: dict[Hashable, asyncio.Queue[Callable[[], Awaitable[None]]]] = {}
+        self._workers: set[asyncio.Task] = set()
+
+    async def submit(self, key: Hashable, job: Callable[[], Awaitable[None]]) -> bool:
+        """
+        Queues a job behind any other jobs for the same key. Waits while the
+        key already has `max_queued` jobs waiting, and drops the job if
+        `max_pending` jobs are already queued or running across all keys.
+
+        Args:
+            key (Hashable): The key to order jobs by.
+            job (Callable[[], Awaitable[None]]): The job to run.
+
+        Returns:
+            bool: Whether the job was queued.
+        """
+        # Bounds memory across keys, as each key has its own queue and worker
+        if self.pending >= self.max_pending:
+            return False
+
+        queue = self._queues.get(key)
+
+        if queue is None:
+            queue = asyncio.Queue(self.max_queued)
+            self._queues[key] = queue
+
+            worker = asyncio.create_task(self._work(key, queue))
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+
+        self.pending += 1
+        try:
+            await queue.put(job)
+        except BaseException:
+            self.pending -= 1
+            raise
+
+        return True
+
+    async def _work(self, key: Hashable, queue: asyncio.Queue):
+        # The worker exits once its queue is drained, so idle keys hold no state
+        try:
+            while not queue.empty():
+                job = queue.get_nowait()
+                async with self._semaphore:
+                    try:
+                        await job()
+                    except Exception:
+                        logger.exception(f"Job for {key} failed.")
+                    finally:
+                        self.pending -= 1
+        finally:
+            if self._queues.get(key) is queue:
+                del self._queues[key]
@@ -0,0 +1,74 @@
+from typing import Optional
+
+import discord
+from discord.ext import commands
+
+from utils.config import Config
+
+modmail_config = Config()
+
+# Resolved once at startup and shared by every cog
+_modmail_channel: Optional[discord.TextChannel] = None
+_allowed_guild: Optional[discord.Guild] = None
+
+
+async def get_modmail_channel(bot: commands.Bot) -> discord.TextChannel:
+    """
+    Gets the modmail channel specified in config, fetching it only once.
+
+    Args:
+        bot (commands.Bot): The bot object.
+
+    Raises:
+        ValueError: The channel was not found.
+        TypeError: The channel is not a text channel.
+
+    Returns:
+        discord.TextChannel: The modmail channel.
+    """
+    global _modmail_channel
+    if _modmail_channel is not None:
+        return _modmail_channel
+
+    channel = bot.get_channel(modmail_config.channel)
+    if channel is None:
+        try:
+            channel = await bot.fetch_channel(modmail_config.channel)
+        except Exception as e:
+            raise ValueError(
+                "The channel specified in config was not found. Please check your config."
+            ) from e
+
+    if not isinstance(channel, discord.TextChannel):
+        raise TypeError("The channel specified in config was not a text channel.")
+
+    _modmail_channel = channel
+    return channel
+
+
+async def get_allowed_guild(bot: commands.Bot) -> Optional[discord.Guild]:
+    """
+    Gets the allowed guild specified in config, if any. The gateway guild is
+    preferred once available, otherwise the guild is fetched only once.
+
+    Args:
+        bot (commands.Bot): The bot object.
+
+    Returns:
+        Optional[discord.Guild]: The allowed guild.
+    """
+    global _allowed_guild
+    if not modmail_config.allowed_guild:
+        return None
+
+    guild_id = modmail_config.allowed_guild.guild_id
+    guild = bot.get_guild(guild_id) or _allowed_guild
+    if guild is not None:
+        return guild
+
+    try:
+        _allowed_guild = await bot.fetch_guild(guild_id)
+    except discord.errors.NotFound:
+        return None
+
+    return _allowed_guild
@@ -0,0 +1,146 @@
+import asyncio
+from collections import OrderedDict
+import time
+from typing import Optional
+
+import discord
+
+from utils.config import Config
+
+modmail_config = Config()
+
+MEMBER_CACHE_SIZE = 4096
+MEMBER_TTL = 300  # seconds
+# Member update events only fire for members in the gateway cache, so without
+# a full member cache nothing invalidates found members before they expire
+UNCACHED_MEMBER_TTL = 60  # seconds
+NOT_FOUND_TTL = 60  # seconds
+
+
+class MemberCache:
+    """LRU cache of member lookups per guild, including users who are not members."""
+
+    def __init__(
+        self,
+        maxsize: int = MEMBER_CACHE_SIZE,
+        ttl: float = MEMBER_TTL,
+        not_found_ttl: float = NOT_FOUND_TTL,
+    ) -> None:
+        """
+        Args:
+            maxsize (int, optional): Maximum number of cached lookups. Defaults to MEMBER_CACHE_SIZE.
+            ttl (float, optional): Seconds a found member is cached for. Defaults to MEMBER_TTL.
+            not_found_ttl (float, optional): Seconds a missing member is cached for. Defaults to NOT_FOUND_TTL.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.not_found_ttl = not_found_ttl
+        self._entries: OrderedDict[
+            tuple[int, int], tuple[float, Optional[discord.Member]]
+        ] = OrderedDict()
+
+    def get(self, guild_id: int, user_id: int) -> tuple[bool, Optional[discord.Member]]:
+        """
+        Looks up a cached member.
+
+        Args:
+            guild_id (int): The guild ID.
+            user_id (int): The user ID.
+
+        Returns:
+            tuple[bool, Optional[discord.Member]]: Whether the lookup is cached, and the member (None if not a member).
+        """
+        key = (guild_id, user_id)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return False, None
+
+        expires, member = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, member
+
+    def set(self, guild_id: int, user_id: int, member: Optional[discord.Member]):
+        """
+        Caches a lookup.
+
+        Args:
+            guild_id (int): The guild ID.
+            user_id (int): The user ID.
+            member (Optional[discord.Member]): The member, or None if the user is not a member.
+        """
+        ttl = self.ttl if member is not None else self.not_found_ttl
+        self._entries[(guild_id, user_id)] = (time.monotonic() + ttl, member)
+        self._entries.move_to_end((guild_id, user_id))
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, guild_id: int, user_id: int):
+        """
+        Removes a cached lookup.
+
+        Args:
+            guild_id (int): The guild ID.
+            user_id (int): The user ID.
+        """
+        self._entries.pop((guild_id, user_id), None)
+
+
+member_cache = MemberCache(
+    ttl=MEMBER_TTL if modmail_config.member_cache == "full" else UNCACHED_MEMBER_TTL
+)
+
+
+async def lookup_member(guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+    """
+    Looks up a member without the gateway cache, over the gateway when the
+    `query` member cache is configured and otherwise from the API.
+
+    Args:
+        guild (discord.Guild): The guild.
+        user_id (int): The user ID.
+
+    Returns:
+        Optional[discord.Member]: The member, or None if the user is not in the guild.
+    """
+    if modmail_config.member_cache == "query":
+        try:
+            found = await guild.query_members(user_ids=[user_id], cache=False)
+            return found[0] if found else None
+        except (asyncio.TimeoutError, discord.errors.ClientException):
+            # Fall back to the API if the gateway does not answer
+            pass
+
+    try:
+        return await guild.fetch_member(user_id)
+    except discord.errors.NotFound:
+        return None
+
+
+async def resolve_member(guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+    """
+    Gets a member from the gateway cache, the member cache or a lookup, in that order.
+
+    Args:
+        guild (discord.Guild): The guild.
+        user_id (int): The user ID.
+
+    Returns:
+        Optional[discord.Member]: The member, or None if the user is not in the guild.
+    """
+    member = guild.get_member(user_id)
+    if member is not None:
+        return member
+
+    cached, member = member_cache.get(guild.id, user_id)
+    if cached:
+        return member
+
+    member = await lookup_member(guild, user_id)
+    member_cache.set(guild.id, user_id, member)
+    return member
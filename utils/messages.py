@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from typing import Union
+
+import discord
+
+TICKET_MESSAGE_CACHE_SIZE = 256
+
+
+class TicketMessageCache:
+    """LRU cache of the ticket messages sent by the bot, so that they need not be fetched."""
+
+    def __init__(self, maxsize: int = TICKET_MESSAGE_CACHE_SIZE) -> None:
+        """
+        Args:
+            maxsize (int, optional): Maximum number of cached messages. Defaults to TICKET_MESSAGE_CACHE_SIZE.
+        """
+        self.maxsize = maxsize
+        self._messages: OrderedDict[
+            int, Union[discord.Message, discord.PartialMessage]
+        ] = OrderedDict()
+
+    def add(self, message: Union[discord.Message, discord.PartialMessage]):
+        """
+        Caches a ticket message.
+
+        Args:
+            message (Union[discord.Message, discord.PartialMessage]): The ticket message.
+        """
+        # Interaction messages are edited and deleted through the interaction
+        # token, which expires after 15 minutes, so are bound to their channel
+        if isinstance(message, discord.InteractionMessage):
+            message = message.channel.get_partial_message(message.id)
+
+        self._messages[message.id] = message
+        self._messages.move_to_end(message.id)
+
+        while len(self._messages) > self.maxsize:
+            self._messages.popitem(last=False)
+
+    def get(
+        self, channel: discord.TextChannel, message_id: int
+    ) -> Union[discord.Message, discord.PartialMessage]:
+        """
+        Gets a ticket message, or a partial message if it is not cached. Either
+        can be edited or deleted without fetching the message first.
+
+        Args:
+            channel (discord.TextChannel): The channel of the message.
+            message_id (int): The message ID.
+
+        Returns:
+            Union[discord.Message, discord.PartialMessage]: The ticket message.
+        """
+        message = self._messages.get(message_id)
+        if message is None:
+            return channel.get_partial_message(message_id)
+
+        self._messages.move_to_end(message_id)
+        return message
+
+    def discard(self, message_id: int):
+        """
+        Removes a ticket message, e.g. once it has been deleted.
+
+        Args:
+            message_id (int): The message ID.
+        """
+        self._messages.pop(message_id, None)
+
+
+ticket_messages = TicketMessageCache()
@@ -1,10 +1,12 @@
-from typing import Union, Optional
-from collections.abc import Collection
+import bisect
+from typing import Union, Optional, overload
+from collections.abc import Collection, Sequence
 
 import discord
 
 NAME_SIZE_LIMIT = 256
 VALUE_SIZE_LIMIT = 1024
+PAGE_SIZE_LIMIT = 5090  # leave 10 chars for footers
 
 
 def paginated_embed_menus(
@@ -14,7 +16,8 @@ def paginated_embed_menus(
     *,
     inline: Union[Collection[bool], bool] = False,
     embed_dict: Optional[dict] = None,
-) -> Collection[discord.Embed]:
+    lazy: bool = False,
+) -> Sequence[discord.Embed]:
     """
     Generates embeds for a paginated embed view.
 
@@ -24,9 +27,10 @@ def paginated_embed_menus(
         pagesize (int, optional): Maximum number of items per page. Defaults to 10.
         inline (Union[Collection[bool], bool], optional): Whether embed fields should be inline or not. Defaults to False.
         embed_dict (Optional[dict], optional): Partial embed dictionary (for setting a title, description, etc.). Footer and fields must not be set. Defaults to None.
+        lazy (bool, optional): Whether to only build each embed when its page is accessed. Defaults to False.
 
     Returns:
-        Collection[discord.Embed]: Collection of embeds for paginated embed view.
+        Sequence[discord.Embed]: Sequence of embeds for paginated embed view.
     """
     N = len(names)
     if N != len(values):
@@ -52,26 +56,162 @@ def paginated_embed_menus(
     else:
         embed_dict = {"description": "Here is a list of entries."}  # default
 
-    if N == 0:
-        return [discord.Embed.from_dict(embed_dict)]
-
-    embeds: Collection[discord.Embed] = []
-    current: discord.Embed = discord.Embed.from_dict(embed_dict)
-    pages = 1
-    items = 0
+    pages = EmbedPages(embed_dict, pagesize)
     for name, value, inline_field in zip(names, values, inline):
-        if (
-            items == pagesize or len(current) + len(name) + len(value) > 5090
-        ):  # leave 10 chars for footers
-            embeds.append(current)
-            current = discord.Embed.from_dict(embed_dict)
-            pages += 1
-            items = 0
-
-        current.add_field(name=name, value=value, inline=inline_field)
-        items += 1
-    embeds.append(current)
-    for page, embed in enumerate(embeds):
-        embed.set_footer(text=f"Page {page+1}/{pages}")
-
-    return embeds
+        pages.add_field(name, value, inline_field)
+
+    embeds = pages.embeds()
+    return embeds if lazy else list(embeds)
+
+
+class LazyEmbeds(Sequence[discord.Embed]):
+    """Pages of a paginated embed view, where each embed is only built when accessed."""
+
+    def __init__(
+        self,
+        embed_dict: dict,
+        pages: Sequence[Sequence[tuple[str, str, bool]]],
+        truncated: bool = False,
+    ) -> None:
+        """
+        Args:
+            embed_dict (dict): Partial embed dictionary (for setting a title, description, etc.).
+            pages (Sequence[Sequence[tuple[str, str, bool]]]): Name, value and inline flag of the fields on each page.
+            truncated (bool, optional): Whether entries before the first page were left out. Defaults to False.
+        """
+        self.embed_dict = embed_dict
+        self.pages = pages
+        self.truncated = truncated
+        self._built: dict[int, discord.Embed] = {}
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    @overload
+    def __getitem__(self, index: int) -> discord.Embed: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[discord.Embed]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("page index out of range")
+
+        embed = self._built.get(index)
+        if embed is None:
+            embed = discord.Embed.from_dict(self.embed_dict)
+            for name, value, inline in self.pages[index]:
+                embed.add_field(name=name, value=value, inline=inline)
+            # A single page without entries has no footer
+            if self.pages[index]:
+                embed.set_footer(text=f"Page {index + 1}/{len(self)}")
+            self._built[index] = embed
+
+        return embed
+
+
+class EmbedPages:
+    """
+    Incrementally packs embed fields into pages in a single pass, using running
+    character counts rather than measuring embeds. Fields can be added after
+    the embeds have been generated without recomputing the earlier pages.
+    """
+
+    def __init__(self, embed_dict: dict, pagesize: int = 10) -> None:
+        """
+        Args:
+            embed_dict (dict): Partial embed dictionary (for setting a title, description, etc.). Footer and fields must not be set.
+            pagesize (int, optional): Maximum number of items per page. Defaults to 10.
+        """
+        self.embed_dict = embed_dict
+        self.pagesize = pagesize
+        self.header_size = len(discord.Embed.from_dict(embed_dict))
+        self.pages: list[list[tuple[str, str, bool]]] = [[]]
+        self.count = 0
+        self._page_starts = [0]
+        self._last_page_size = self.header_size
+
+    def add_field(self, name: str, value: str, inline: bool = False):
+        """
+        Adds a field to the last page, opening a new page if it is full.
+
+        Args:
+            name (str): Name of the field.
+            value (str): Value of the field.
+            inline (bool, optional): Whether the field should be inline or not. Defaults to False.
+        """
+        page = self.pages[-1]
+        size = len(name) + len(value)
+        if page and (
+            len(page) == self.pagesize or self._last_page_size + size > PAGE_SIZE_LIMIT
+        ):
+            page = []
+            self.pages.append(page)
+            self._page_starts.append(self.count)
+            self._last_page_size = self.header_size
+
+        page.append((name, value, inline))
+        self._last_page_size += size
+        self.count += 1
+
+    def page_of(self, field: int) -> int:
+        """
+        Returns the index of the page a field was added to.
+
+        Args:
+            field (int): Index of the field, in the order fields were added.
+
+        Returns:
+            int: The page index.
+        """
+        return bisect.bisect_right(self._page_starts, field) - 1
+
+    def embeds(self, truncated: bool = False) -> LazyEmbeds:
+        """
+        Generates embeds for a paginated embed view. Embeds are built when
+        their page is accessed, so only the pages actually shown are built.
+
+        Args:
+            truncated (bool, optional): Whether entries before the first field were left out. Defaults to False.
+
+        Returns:
+            LazyEmbeds: Embeds for each page of the fields added so far.
+        """
+        # Only the last page can still change, so it is the only one copied
+        pages = self.pages[:-1] + [list(self.pages[-1])]
+        return LazyEmbeds(self.embed_dict, pages, truncated)
+
+
+class PaginationView(discord.ui.View):
+    """Previous/next page buttons for a paginated embed view."""
+
+    def __init__(self, embeds: Sequence[discord.Embed], timeout: int = 300) -> None:
+        super().__init__(timeout=timeout)
+        self.embeds = embeds
+        self.current_page = 0
+        self.update_buttons()
+
+    def update_buttons(self):
+        self.previous_page.disabled = self.current_page == 0
+        self.next_page.disabled = self.current_page == len(self.embeds) - 1
+
+    @discord.ui.button(emoji="⬅️", style=discord.ButtonStyle.blurple)
+    async def previous_page(self, interaction: discord.Interaction, _):
+        self.current_page = max(self.current_page - 1, 0)
+        self.update_buttons()
+        await interaction.response.edit_message(
+            embed=self.embeds[self.current_page], view=self
+        )
+
+    @discord.ui.button(emoji="➡️", style=discord.ButtonStyle.blurple)
+    async def next_page(self, interaction: discord.Interaction, _):
+        self.current_page = min(self.current_page + 1, len(self.embeds) - 1)
+        self.update_buttons()
+        await interaction.response.edit_message(
+            embed=self.embeds[self.current_page], view=self
+        )
@@ -0,0 +1,257 @@
+import asyncio
+from enum import IntEnum
+import heapq
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Optional, TypeVar, Union
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+# Requests per second and burst size for each operation in a single channel,
+# matching Discord's own per-channel limits
+ROUTE_BUDGETS = {
+    "send": (1.0, 5),
+    "edit": (1.0, 5),
+    "delete": (5.0, 5),
+    "react": (4.0, 1),
+}
+GLOBAL_BUDGET = (40.0, 40)  # Discord allows 50 requests per second in total
+MAX_IDLE_BUCKETS = 1024  # per-channel buckets kept before idle ones are pruned
+
+LOW_MAX_WAIT = 10  # seconds before deferred work is dropped
+LOW_MAX_PENDING = 100  # deferred calls waiting at once before new ones are dropped
+
+
+class Priority(IntEnum):
+    """Priority of a REST call. Lower values are sent first."""
+
+    CRITICAL = 0  # replies from staff to users
+    HIGH = 1  # ticket messages and notices
+    LOW = 2  # cosmetic work, which can be deferred or dropped
+
+
+class TokenBucket:
+    """Token bucket where waiting calls are let through in order of priority."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """
+        Args:
+            rate (float): Tokens added per second.
+            capacity (int): Maximum number of tokens, i.e. the burst size.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._drain: Optional[asyncio.Task] = None
+
+    @property
+    def idle(self) -> bool:
+        """Whether the bucket is full and nothing is waiting, so it can be recreated at will."""
+        self._refill()
+        return not self._waiters and self.tokens >= self.capacity
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, priority: Priority):
+        """
+        Waits for a token, after any waiting calls of the same or a higher priority.
+
+        Args:
+            priority (Priority): The priority of the call.
+        """
+        self._refill()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+
+        if self._drain is None or self._drain.done():
+            self._drain = asyncio.create_task(self._drain_waiters())
+
+        await future
+
+    async def _drain_waiters(self):
+        while self._waiters:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                continue
+
+            _, _, future = heapq.heappop(self._waiters)
+            # Skip calls which stopped waiting, e.g. dropped deferred work
+            if not future.done():
+                self.tokens -= 1
+                future.set_result(None)
+
+
+class RestBudget:
+    """
+    Schedules outgoing REST calls against per-channel and global budgets, so that
+    under load important calls go first and low priority work is dropped.
+    """
+
+    def __init__(self) -> None:
+        self.routes: dict[tuple[str, int], TokenBucket] = {}
+        self.global_bucket = TokenBucket(*GLOBAL_BUDGET)
+        self._deferred: set[asyncio.Task] = set()
+
+    async def acquire(self, operation: str, channel_id: int, priority: Priority):
+        """
+        Waits until an operation can be made in a channel.
+
+        Args:
+            operation (str): The operation, one of ROUTE_BUDGETS.
+            channel_id (int): The channel ID, or the user ID for DMs.
+            priority (Priority): The priority of the call.
+        """
+        key = (operation, channel_id)
+        bucket = self.routes.get(key)
+        if bucket is None:
+            if len(self.routes) >= MAX_IDLE_BUCKETS:
+                self.routes = {k: b for k, b in self.routes.items() if not b.idle}
+            bucket = self.routes[key] = TokenBucket(*ROUTE_BUDGETS[operation])
+
+        await bucket.acquire(priority)
+        await self.global_bucket.acquire(priority)
+
+    async def call(
+        self,
+        operation: str,
+        channel_id: int,
+        priority: Priority,
+        func: Callable[..., Awaitable[R]],
+        *args,
+        **kwargs,
+    ) -> R:
+        """
+        Makes a call once the budget allows it.
+
+        Args:
+            operation (str): The operation, one of ROUTE_BUDGETS.
+            channel_id (int): The channel ID, or the user ID for DMs.
+            priority (Priority): The priority of the call.
+            func (Callable[..., Awaitable[R]]): Makes the call, with the remaining arguments.
+
+        Returns:
+            R: The result of the call.
+        """
+        await self.acquire(operation, channel_id, priority)
+        return await func(*args, **kwargs)
+
+    def defer(
+        self,
+        operation: str,
+        channel_id: int,
+        func: Callable[..., Awaitable],
+        *args,
+        **kwargs,
+    ):
+        """
+        Makes a low priority call in the background. The call is dropped if too
+        many are already pending, or if it cannot be made within LOW_MAX_WAIT.
+
+        Args:
+            operation (str): The operation, one of ROUTE_BUDGETS.
+            channel_id (int): The channel ID, or the user ID for DMs.
+            func (Callable[..., Awaitable]): Makes the call, with the remaining arguments.
+        """
+        if len(self._deferred) >= LOW_MAX_PENDING:
+            logger.debug(f"Dropped deferred {operation} in {channel_id}.")
+            return
+
+        task = asyncio.create_task(
+            self._run_deferred(operation, channel_id, func, *args, **kwargs)
+        )
+        self._deferred.add(task)
+        task.add_done_callback(self._deferred.discard)
+
+    async def _run_deferred(
+        self, operation: str, channel_id: int, func: Callable[..., Awaitable], *args, **kwargs
+    ):
+        try:
+            await asyncio.wait_for(
+                self.acquire(operation, channel_id, Priority.LOW), LOW_MAX_WAIT
+            )
+        except asyncio.TimeoutError:
+            logger.debug(f"Dropped deferred {operation} in {channel_id}.")
+            return
+
+        try:
+            await func(*args, **kwargs)
+        except discord.errors.HTTPException as e:
+            logger.debug(f"Deferred {operation} in {channel_id} failed: {e}")
+
+
+rest_budget = RestBudget()
+
+
+async def send(
+    destination: Union[discord.abc.Messageable, discord.abc.User],
+    priority: Priority,
+    **kwargs,
+) -> discord.Message:
+    """
+    Sends a message to a channel or user within the REST budget.
+
+    Args:
+        destination (Union[discord.abc.Messageable, discord.abc.User]): The channel or user.
+        priority (Priority): The priority of the call.
+
+    Returns:
+        discord.Message: The message sent.
+    """
+    return await rest_budget.call("send", destination.id, priority, destination.send, **kwargs)
+
+
+async def edit(
+    message: Union[discord.Message, discord.PartialMessage], priority: Priority, **kwargs
+) -> discord.Message:
+    """
+    Edits a message within the REST budget.
+
+    Args:
+        message (Union[discord.Message, discord.PartialMessage]): The message.
+        priority (Priority): The priority of the call.
+
+    Returns:
+        discord.Message: The edited message.
+    """
+    return await rest_budget.call("edit", message.channel.id, priority, message.edit, **kwargs)
+
+
+async def delete(
+    message: Union[discord.Message, discord.PartialMessage], priority: Priority
+):
+    """
+    Deletes a message within the REST budget.
+
+    Args:
+        message (Union[discord.Message, discord.PartialMessage]): The message.
+        priority (Priority): The priority of the call.
+    """
+    await rest_budget.call("delete", message.channel.id, priority, message.delete)
+
+
+def react(message: discord.Message, emoji: str):
+    """
+    Adds a reaction to a message in the background, as low priority work which
+    is dropped under load.
+
+    Args:
+        message (discord.Message): The message.
+        emoji (str): The emoji.
+    """
+    rest_budget.defer("react", message.channel.id, message.add_reaction, emoji)
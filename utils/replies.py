@@ -0,0 +1,64 @@
+import asyncio
+from typing import Optional
+
+import discord
+
+REPLY_TIMEOUT = 60  # seconds, matching the reply cancel view
+
+
+class ReplyRouter:
+    """Routes staff messages to the pending reply of their author in that channel."""
+
+    def __init__(self) -> None:
+        self._pending: dict[tuple[int, int], asyncio.Future[discord.Message]] = {}
+
+    async def wait(
+        self, channel_id: int, author_id: int, timeout: float = REPLY_TIMEOUT
+    ) -> Optional[discord.Message]:
+        """
+        Waits for the next message from an author in a channel. A newer wait by
+        the same author in the same channel replaces this one.
+
+        Args:
+            channel_id (int): The channel ID.
+            author_id (int): The author ID.
+            timeout (float, optional): Seconds to wait for. Defaults to REPLY_TIMEOUT.
+
+        Returns:
+            Optional[discord.Message]: The message, or None if expired or replaced.
+        """
+        key = (channel_id, author_id)
+        previous = self._pending.get(key)
+        if previous is not None and not previous.done():
+            previous.set_result(None)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def dispatch(self, message: discord.Message) -> bool:
+        """
+        Passes a message to the pending reply of its author in its channel, if any.
+
+        Args:
+            message (discord.Message): The message.
+
+        Returns:
+            bool: Whether the message was a reply.
+        """
+        future = self._pending.pop((message.channel.id, message.author.id), None)
+        if future is None or future.done():
+            return False
+
+        future.set_result(message)
+        return True
+
+
+reply_router = ReplyRouter()
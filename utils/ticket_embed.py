@@ -1,5 +1,7 @@
 import asyncio
+from collections import OrderedDict
 import logging
+import re
 from typing import Collection, Optional, Union
 
 import discord
@@ -7,14 +9,20 @@ from discord.ext import commands
 from discord.utils import format_dt
 
 import db
-from utils import actions
+from utils import actions, members
 from utils.config import Config
-from utils.pagination import paginated_embed_menus
+from utils.pagination import EmbedPages, LazyEmbeds
 
 logger = logging.getLogger(__name__)
 
 modmail_config = Config()
 
+TRANSCRIPT_CACHE_SIZE = 256
+# Responses loaded when a ticket is first rendered, and each time earlier responses are paged to
+TRANSCRIPT_WINDOW = 100
+
+PAGE_FOOTER = re.compile(r"Page (\d+)/\d+")
+
 
 class ConfirmationView(discord.ui.View):
     """Confirmation view for yes/no operations."""
@@ -73,11 +81,18 @@ class CancelView(discord.ui.View):
 class MessageButtonsView(discord.ui.View):
     """Message buttons view for ticket messages."""
 
-    def __init__(self, bot: commands.Bot, embeds: Collection[discord.Embed]):
+    def __init__(
+        self,
+        bot: commands.Bot,
+        embeds: Collection[discord.Embed],
+        current_page: Optional[int] = None,
+    ):
         super().__init__(timeout=None)
         self.bot = bot
         self.embeds = embeds
         self.current_page = len(self.embeds) - 1
+        if current_page is not None:
+            self.current_page = max(min(current_page, self.current_page), 0)
 
     @discord.ui.button(emoji="💬", custom_id=f"{modmail_config.id_prefix}:reply")
     async def mail_reply(self, interaction: discord.Interaction, _):
@@ -148,17 +163,18 @@ class MessageButtonsView(discord.ui.View):
         """
         Goes to the previous page.
         """
-        if len(self.embeds) == 0:
-            await interaction.response.send_message(
-                "Please refresh this ticket to be able to use pagination.",
-                ephemeral=True,
-            )
-            return
-
-        if self.current_page > 0:
-            self.current_page -= 1
-            self.update_pagination_buttons()
-            await self.update_view(interaction)
+        view = self if len(self.embeds) > 0 else await self.restore_view(interaction)
+
+        if view and view.current_page == 0 and view.truncated:
+            # Earlier responses are only loaded once paged to
+            view = await view.load_earlier(interaction)
+            if view:
+                view.update_pagination_buttons()
+                await view.update_view(interaction)
+        elif view and (view.current_page > 0 or view is not self):
+            view.current_page = max(view.current_page - 1, 0)
+            view.update_pagination_buttons()
+            await view.update_view(interaction)
 
     @discord.ui.button(
         emoji="➡️",
@@ -169,17 +185,64 @@ class MessageButtonsView(discord.ui.View):
         """
         Goes to the next page.
         """
-        if len(self.embeds) == 0:
+        view = self if len(self.embeds) > 0 else await self.restore_view(interaction)
+
+        if view and (view.current_page < len(view.embeds) - 1 or view is not self):
+            view.current_page = min(view.current_page + 1, len(view.embeds) - 1)
+            view.update_pagination_buttons()
+            await view.update_view(interaction)
+
+    async def restore_view(
+        self, interaction: discord.Interaction
+    ) -> Optional["MessageButtonsView"]:
+        """
+        Rebuilds the pages of a ticket message whose view was lost (e.g., on restart),
+        starting from the page the message currently shows.
+        """
+        ticket = await db.get_ticket_by_message(interaction.message.id)
+
+        member, source_guild = None, None
+        if ticket and ticket.open:
+            member, source_guild = await actions.get_guild_member(
+                self.bot, interaction, ticket.user
+            )
+
+        if not member or not source_guild:
             await interaction.response.send_message(
                 "Please refresh this ticket to be able to use pagination.",
                 ephemeral=True,
             )
-            return
+            return None
+
+        embeds = await channel_embed(interaction.guild, source_guild, ticket)
 
-        if self.current_page < len(self.embeds) - 1:
-            self.current_page += 1
-            self.update_pagination_buttons()
-            await self.update_view(interaction)
+        return MessageButtonsView(
+            self.bot, embeds, current_page=displayed_page(interaction.message)
+        )
+
+    async def load_earlier(
+        self, interaction: discord.Interaction
+    ) -> Optional["MessageButtonsView"]:
+        """
+        Loads the responses before the first page, showing the last page of them.
+        """
+        ticket = await db.get_ticket_by_message(interaction.message.id)
+        earlier = await earlier_embeds(interaction.guild, ticket) if ticket else None
+
+        if not earlier:
+            await interaction.response.send_message(
+                "Please refresh this ticket to be able to use pagination.",
+                ephemeral=True,
+            )
+            return None
+
+        embeds, page = earlier
+        return MessageButtonsView(self.bot, embeds, current_page=page)
+
+    @property
+    def truncated(self) -> bool:
+        """Whether responses before the first page have not been loaded yet."""
+        return isinstance(self.embeds, LazyEmbeds) and self.embeds.truncated
 
     def update_pagination_buttons(self):
         """
@@ -187,7 +250,7 @@ class MessageButtonsView(discord.ui.View):
         """
         for i in self.children:
             i.disabled = False
-        if self.current_page == 0:
+        if self.current_page == 0 and not self.truncated:
             self.children[3].disabled = True
         if self.current_page == len(self.embeds) - 1:
             self.children[4].disabled = True
@@ -211,6 +274,22 @@ class MessageButtonsView(discord.ui.View):
         return self.embeds[self.current_page], self
 
 
+def displayed_page(message: discord.Message) -> Optional[int]:
+    """Returns the index of the page shown by a paginated message.
+
+    Args:
+        message (discord.Message): The paginated message.
+
+    Returns:
+        Optional[int]: The page index, if the message has a page footer.
+    """
+    if not message.embeds or not message.embeds[0].footer.text:
+        return None
+
+    match = PAGE_FOOTER.match(message.embeds[0].footer.text)
+    return int(match[1]) - 1 if match else None
+
+
 def user_embed(guild: discord.Guild, message: str) -> discord.Embed:
     """Returns formatted embed for user DMs.
 
@@ -227,6 +306,139 @@ def user_embed(guild: discord.Guild, message: str) -> discord.Embed:
     return message_embed
 
 
+class TicketTranscript:
+    """
+    Rendered transcript of a ticket, extended as new responses are added. Only
+    the latest responses are loaded at first, earlier ones as they are paged to.
+    """
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.values: list[str] = []
+        self.first_response_id = 0
+        self.last_response_id = 0
+        self.earlier = 0  # responses before the first loaded one
+        self.pages: Optional[EmbedPages] = None
+
+    @staticmethod
+    def field(
+        response: db.TicketResponse, staff: Optional[discord.Member] = None
+    ) -> tuple[str, str]:
+        """
+        Returns the name and value of the embed field for a response.
+
+        Args:
+            response (db.TicketResponse): The ticket response.
+            staff (Optional[discord.Member], optional): The staff member, for responses sent as server. Defaults to None.
+
+        Returns:
+            tuple[str, str]: The field name and value.
+        """
+        author = "user"
+        if response.as_server:
+            # Staff who have since left the guild are shown by ID
+            author = f"{staff or response.user} as server"
+        return f"<t:{response.timestamp}:R>, {author} wrote", response.response
+
+    def add_response(
+        self, response: db.TicketResponse, staff: Optional[discord.Member] = None
+    ):
+        """
+        Adds a response to the transcript, if it has not been added already.
+
+        Args:
+            response (db.TicketResponse): The ticket response.
+            staff (Optional[discord.Member], optional): The staff member, for responses sent as server. Defaults to None.
+        """
+        if response.response_id <= self.last_response_id:
+            return
+
+        name, value = self.field(response, staff)
+        self.names.append(name)
+        self.values.append(value)
+        self.last_response_id = response.response_id
+        if not self.first_response_id:
+            self.first_response_id = response.response_id
+
+    def add_earlier_responses(
+        self, responses: list[db.TicketResponse], staff: dict[int, discord.Member]
+    ):
+        """
+        Adds responses from before the first loaded response to the start of the transcript.
+
+        Args:
+            responses (list[db.TicketResponse]): The responses, oldest first.
+            staff (dict[int, discord.Member]): Staff members by user ID, for responses sent as server.
+        """
+        responses = [r for r in responses if r.response_id < self.first_response_id]
+        if not responses:
+            self.earlier = 0
+            return
+
+        fields = [self.field(response, staff.get(response.user)) for response in responses]
+        self.names[:0] = [name for name, _ in fields]
+        self.values[:0] = [value for _, value in fields]
+        self.first_response_id = responses[0].response_id
+        self.earlier = max(self.earlier - len(responses), 0)
+
+        # Fields were added before the first page, so every page is packed again
+        if self.pages is not None:
+            self.pages = EmbedPages(self.pages.embed_dict)
+
+    def embeds(self, embed_dict: Optional[dict] = None) -> LazyEmbeds:
+        """
+        Returns the paginated embeds of the transcript.
+
+        Args:
+            embed_dict (Optional[dict], optional): Partial embed dictionary with the title and description. Defaults to the last one used.
+
+        Returns:
+            LazyEmbeds: Embeds for the ticket.
+        """
+        # Pages only need to be packed again if the header has changed
+        if self.pages is None or (embed_dict is not None and self.pages.embed_dict != embed_dict):
+            self.pages = EmbedPages(embed_dict)
+
+        for name, value in zip(
+            self.names[self.pages.count :], self.values[self.pages.count :]
+        ):
+            self.pages.add_field(name, value)
+
+        return self.pages.embeds(truncated=self.earlier > 0)
+
+
+async def _resolve_staff(
+    guild: discord.Guild, responses: list[db.TicketResponse]
+) -> dict[int, discord.Member]:
+    """Looks up the staff members who sent responses as server, concurrently.
+
+    Args:
+        guild (discord.Guild): The guild.
+        responses (list[db.TicketResponse]): The responses.
+
+    Returns:
+        dict[int, discord.Member]: Staff members by user ID.
+    """
+    # Staff members may not be in the gateway cache, so are looked up together
+    staff_ids = list({response.user for response in responses if response.as_server})
+    staff = await asyncio.gather(
+        *(members.resolve_member(guild, user_id) for user_id in staff_ids)
+    )
+    return {user_id: member for user_id, member in zip(staff_ids, staff) if member}
+
+
+_transcripts: OrderedDict[int, TicketTranscript] = OrderedDict()
+
+
+def discard_transcript(ticket_id: int):
+    """Removes the cached transcript for a ticket.
+
+    Args:
+        ticket_id (int): The ticket ID.
+    """
+    _transcripts.pop(ticket_id, None)
+
+
 async def channel_embed(
     guild: discord.Guild, source_guild: discord.Guild, ticket: db.Ticket
 ) -> Collection[discord.Embed]:
@@ -241,21 +453,36 @@ async def channel_embed(
         Collection[discord.Embed]: Collection of embeds for the ticket.
     """
 
-    ticket_member = source_guild.get_member(ticket.user) or await source_guild.fetch_member(
-        ticket.user
-    )
+    # Queued responses are read back below
+    await db.flush()
+
+    ticket_member = await members.resolve_member(source_guild, ticket.user)
+
+    if not ticket_member:
+        raise ValueError(f"Ticket user {ticket.user} is not in {source_guild.name}.")
 
-    responses = await db.get_ticket_responses(ticket.ticket_id)
+    transcript = _transcripts.pop(ticket.ticket_id, None) or TicketTranscript()
+    _transcripts[ticket.ticket_id] = transcript
+    if len(_transcripts) > TRANSCRIPT_CACHE_SIZE:
+        _transcripts.popitem(last=False)
+
+    if transcript.last_response_id:
+        # Only responses which are not yet in the transcript are loaded
+        responses = await db.get_ticket_responses_after(
+            ticket.ticket_id, transcript.last_response_id
+        )
+    else:
+        # Long tickets start with their latest responses, earlier ones are loaded when paged to
+        async with db.transaction():
+            responses = await db.get_last_ticket_responses(ticket.ticket_id, TRANSCRIPT_WINDOW)
+            transcript.earlier = (
+                await db.count_ticket_responses(ticket.ticket_id) - len(responses)
+            )
 
-    names = []
-    values = []
+    staff = await _resolve_staff(guild, responses)
 
     for response in responses:
-        author = "user"
-        if response.as_server:
-            author = f"{guild.get_member(response.user)} as server"
-        names.append(f"<t:{response.timestamp}:R>, {author} wrote")
-        values.append(response.response)
+        transcript.add_response(response, staff.get(response.user))
 
     embed_dict = {
         "title": f"{modmail_config.name} Conversation for {ticket_member.name}",
@@ -265,9 +492,33 @@ async def channel_embed(
         f"\n Joined Server: **{format_dt(ticket_member.joined_at, 'D')}**",
     }
 
-    embeds = paginated_embed_menus(names, values, embed_dict=embed_dict)
+    return transcript.embeds(embed_dict)
+
+
+async def earlier_embeds(
+    guild: discord.Guild, ticket: db.Ticket
+) -> Optional[tuple[LazyEmbeds, int]]:
+    """Loads the responses before those rendered for a ticket.
+
+    Args:
+        guild (discord.Guild): The guild.
+        ticket (db.Ticket): The ticket.
+
+    Returns:
+        Optional[tuple[LazyEmbeds, int]]: Embeds for the ticket, and the page of the
+        last newly loaded response, or None if the ticket has not been rendered.
+    """
+    transcript = _transcripts.get(ticket.ticket_id)
+    if transcript is None or transcript.pages is None:
+        return None
+
+    responses = await db.get_ticket_responses_before(
+        ticket.ticket_id, transcript.first_response_id, TRANSCRIPT_WINDOW
+    )
+    transcript.add_earlier_responses(responses, await _resolve_staff(guild, responses))
 
-    return embeds
+    embeds = transcript.embeds()
+    return embeds, transcript.pages.page_of(max(len(responses) - 1, 0))
 
 
 def close_confirmation(member: discord.Member) -> tuple[discord.Embed, discord.ui.View]:
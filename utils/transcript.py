@@ -0,0 +1,115 @@
+import datetime
+import html
+import json
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, Literal
+
+import db
+
+TranscriptFormat = Literal["txt", "jsonl", "html"]
+
+# Transcripts larger than this are spooled to disk rather than kept in memory
+SPOOL_SIZE = 8 * 1024 * 1024
+
+HTML_HEADER = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; }}
+td {{ padding: 4px 8px; vertical-align: top; white-space: pre-wrap; }}
+tr:nth-child(even) {{ background: #f2f2f2; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<table>
+<tr><th>Ticket</th><th>Time (UTC)</th><th>Author</th><th>Response</th></tr>
+"""
+HTML_FOOTER = """</table>
+</body>
+</html>
+"""
+
+
+def _format_time(timestamp: int) -> str:
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime(
+        "%Y-%m-%d %H:%M:%S"
+    )
+
+
+def _format_author(response: db.TicketResponse) -> str:
+    return f"User {response.user}{' as server' if response.as_server else ''}"
+
+
+def format_response(
+    ticket_id: int, response: db.TicketResponse, file_format: TranscriptFormat
+) -> str:
+    """
+    Formats a response as one entry of a transcript.
+
+    Args:
+        ticket_id (int): The ticket ID.
+        response (db.TicketResponse): The response.
+        file_format (TranscriptFormat): The transcript format.
+
+    Returns:
+        str: The formatted entry, including its trailing newline.
+    """
+    if file_format == "jsonl":
+        entry = {
+            "ticket_id": ticket_id,
+            "response_id": response.response_id,
+            "user": response.user,
+            "as_server": bool(response.as_server),
+            "timestamp": response.timestamp,
+            "response": response.response,
+        }
+        return json.dumps(entry, ensure_ascii=False) + "\n"
+
+    if file_format == "html":
+        return (
+            f"<tr><td>{ticket_id}</td>"
+            f"<td>{_format_time(response.timestamp)}</td>"
+            f"<td>{html.escape(_format_author(response))}</td>"
+            f"<td>{html.escape(response.response)}</td></tr>\n"
+        )
+
+    return (
+        f"[{_format_time(response.timestamp)}] Ticket {ticket_id}, "
+        f"{_format_author(response)}: {response.response}\n"
+    )
+
+
+async def write_transcript(
+    responses: AsyncIterator[tuple[int, db.TicketResponse]],
+    file_format: TranscriptFormat,
+    title: str,
+) -> tuple[SpooledTemporaryFile, int]:
+    """
+    Writes streamed responses into a spooled file, one entry at a time.
+
+    Args:
+        responses (AsyncIterator[tuple[int, db.TicketResponse]]): Ticket IDs and responses to write.
+        file_format (TranscriptFormat): The transcript format.
+        title (str): The transcript title (only used by HTML transcripts).
+
+    Returns:
+        tuple[SpooledTemporaryFile, int]: The transcript file, rewound to the start, and the number of responses written.
+    """
+    file = SpooledTemporaryFile(max_size=SPOOL_SIZE)
+
+    if file_format == "html":
+        file.write(HTML_HEADER.format(title=html.escape(title)).encode())
+
+    count = 0
+    async for ticket_id, response in responses:
+        file.write(format_response(ticket_id, response, file_format).encode())
+        count += 1
+
+    if file_format == "html":
+        file.write(HTML_FOOTER.encode())
+
+    file.seek(0)
+    return file, count